@@ -1,123 +1,408 @@
 # Import graph from LangGraph
 from LangGraph import get_remedy_graph
+import argparse
 import csv
 import json
 import os
+import time
 from dotenv import load_dotenv
+import evidence_index
+from evidence import Evidence
+from job_queue import get_job_queue
+from worker import wait_for_jobs
+from Tools.google_search import google_search_batch
+from cpu_pool import pool_stats, reset_pool_stats
+from llm_batcher import batch_stats, reset_batch_stats
+from speculation import reset_speculation_stats, speculation_stats
+from llm_pool import estimate_cost, model_overrides, reset_usage, usage_snapshot
 
 load_dotenv()
 
 # === Input/Output Paths from .env ===
 EVAL_INPUT = os.getenv("EVAL_INPUT", os.path.join("Evaluation", "test_cases.csv"))
 EVAL_OUTPUT = os.getenv("EVAL_OUTPUT", os.path.join("Evaluation", "evaluation_results.csv"))
+EVAL_TIER_OUTPUT = os.getenv("EVAL_TIER_OUTPUT", os.path.join("Evaluation", "tier_comparison.csv"))
+EVAL_MODE_OUTPUT = os.getenv("EVAL_MODE_OUTPUT", os.path.join("Evaluation", "mode_comparison.csv"))
+EVAL_QUEUE = os.getenv("EVAL_QUEUE", "eval")  # job queue name used by --distributed
+
+# Tier combinations compared by `--tiers` when none are given explicitly
+DEFAULT_TIERS = [
+    "router=gpt-4o,summary=gpt-4o,verdict=gpt-4o",
+    "router=gpt-4o-mini,summary=gpt-4o-mini,verdict=gpt-4o",
+    "router=gpt-4o-mini,summary=gpt-4o-mini,verdict=gpt-4o-mini",
+]
 
 # Load the LangGraph instance
 graph = get_remedy_graph()
 
-# Initialize evaluation storage
-results_array = []  # Will hold each row of evaluation results
-total_accuracy = 0  # Counter for correct verdicts
-
 
 # === Evaluation Script ===
 # Reads a list of test claims and expected verdicts from CSV,
 # runs them through the LangGraph, collects outputs from selected tools,
 # compares verdict to ground truth, calculates accuracy,
 # and writes final results to a new CSV file.
+#
+# With --tiers, the same claims are run once per model-tier combination and
+# accuracy is reported against latency and token cost for each tier.
+# With --mode fast the pipeline uses local passage extraction instead of LLM
+# summaries; --mode compare runs full and fast mode side by side.
+# With --distributed the claims are queued as jobs and processed by worker.py
+# processes (see job_queue.py), which may run on several machines.
+# With --google-batch N, Google results are fetched N claims at a time through one
+# Serper batch request; articles behind them are fetched only for claims routed to
+# Google (--snippet-only never fetches them and uses the snippets as evidence).
+
+def load_cases(path: str) -> list:
+    """
+    Reads (claim, ground_truth) pairs from the evaluation CSV.
+    """
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        reader = csv.DictReader(csvfile)
+        return [(row['Claim'].strip(), row['Ground Truth'].strip()) for row in reader]
+
+
+def score_state(claim: str, ground_truth: str, final_state: dict) -> dict:
+    """
+    Scores a finished graph state against ground truth.
+    """
+    # Keep only title, link and a short summary per evidence record
+    tool_outputs_raw = final_state.get("tool_outputs", {})
+    compact_outputs = {
+        tool: [
+            {
+                "title": record.title,
+                "url": record.url,
+                "summary": record.summary[:350] + "…" if len(record.summary) > 350 else record.summary,
+            }
+            for record in records
+        ]
+        for tool, records in tool_outputs_raw.items()
+    }
+
+    result = {
+        "claim": claim,
+        "ground_truth": ground_truth,
+        "selected_tools": ", ".join(final_state.get("selected_tools", [])),
+        "tools_output": json.dumps(compact_outputs, ensure_ascii=False),
+    }
+
+    # Extract and normalize the verdict to "True", "False", or "Unverifiable"
+    full_verdict = final_state.get("final_verdict", "")
+    verdict_text = full_verdict.lower()
+
+    if "true" in verdict_text:
+        result["verdict"] = "True"
+    elif "false" in verdict_text:
+        result["verdict"] = "False"
+    elif "unverifiable" in verdict_text:
+        result["verdict"] = "Unverifiable"
+    else:
+        result["verdict"] = "Unknown"
+
+    # Extract reasoning from the verdict, if present
+    # Prompt is such that the reasoning will start with "Reason:"
+    reason_part = ""
+    if "Reason:" in full_verdict:
+        reason_part = full_verdict.split("Reason:", 1)[1].strip()
+
+    result["reasoning"] = reason_part
+
+    # Compare with ground truth
+    result["accuracy"] = 1 if ground_truth.lower() == result["verdict"].lower() else 0
+
+    return result
+
+
+def error_result(claim: str, ground_truth: str, error: str) -> dict:
+    # Handle errors (e.g., LLM failure) and mark the case as incorrect
+    return {
+        "claim": claim,
+        "ground_truth": ground_truth,
+        "selected_tools": "Error",
+        "tools_output": f"❌ Error: {error}",
+        "verdict": "Error",
+        "reasoning": "",
+        "accuracy": 0
+    }
+
 
-# Read test cases from CSV
-with open(EVAL_INPUT, newline='', encoding='utf-8') as csvfile:
-    reader = csv.DictReader(csvfile)
+def evaluate_case(claim: str, ground_truth: str, mode: str = "full", prefetched: dict = None) -> dict:
+    """
+    Runs one claim through the graph and scores the verdict against ground truth.
+    prefetched holds extra graph inputs gathered ahead of the run (see prefetch_google).
+    """
+    start = time.perf_counter()
+    try:
+        # Run the claim through the LangGraph pipeline
+        inputs = {"user_input": claim, "mode": mode, **(prefetched or {})}
+        result = score_state(claim, ground_truth, graph.invoke(inputs))
+    except Exception as e:
+        result = error_result(claim, ground_truth, str(e))
 
-    for row in reader:
-        claim = row['Claim'].strip()
-        ground_truth = row['Ground Truth'].strip()
+    result["latency_s"] = round(time.perf_counter() - start, 2)
+    return result
+
+
+def skipped_result(ground_truth: str) -> dict:
+    return {
+        "claim": "",
+        "ground_truth": ground_truth,
+        "selected_tools": "Skipped",
+        "tools_output": "⚠️ Empty claim input. Skipped.",
+        "verdict": "Skipped",
+        "reasoning": "",
+        "accuracy": 0,
+        "latency_s": 0.0
+    }
+
+
+def prefetch_google(claims: list, snippet_only: bool = False) -> dict:
+    """
+    Runs one batched Google search for many claims (see google_search_batch) and
+    returns graph inputs per claim.
+
+    Only the Serper results are fetched here: the graph fetches and summarizes their
+    articles if the router picks Google for the claim. With snippet_only the snippets
+    are the claim's final Google evidence.
+    """
+    batch = google_search_batch(claims, snippet_only=True)
+    if snippet_only:
+        return {claim: {"prefetched": {"Google": records}} for claim, records in zip(claims, batch)}
+    return {claim: {"serper_results": records} for claim, records in zip(claims, batch)}
+
+
+def run_evaluation(cases: list, mode: str = "full", google_batch: int = 0, snippet_only: bool = False) -> list:
+    """
+    Evaluates all cases in order, printing running accuracy.
+
+    With google_batch > 0, Google results for every google_batch claims are fetched
+    up front in one Serper batch request (their articles only if the router picks Google).
+    """
+    results_array = []  # Will hold each row of evaluation results
+    total_accuracy = 0  # Counter for correct verdicts
+    prefetched = {}
+
+    for i, (claim, ground_truth) in enumerate(cases):
+        if google_batch and i % google_batch == 0:
+            chunk = [c for c, _ in cases[i:i + google_batch] if c]
+            print(f"🌐 Batched Google search for {len(chunk)} claims...")
+            prefetched = prefetch_google(chunk, snippet_only)
 
         # Handle empty claims gracefully
         if not claim:
             print(f"⚠️ Skipping empty claim at row {len(results_array)+1}")
-            result = {
-                "claim": "",
-                "ground_truth": ground_truth,
-                "selected_tools": "Skipped",
-                "tools_output": "⚠️ Empty claim input. Skipped.",
-                "verdict": "Skipped",
-                "reasoning": "",
-                "accuracy": 0
-            }
-            results_array.append(result)
+            results_array.append(skipped_result(ground_truth))
             continue
-        
+
         print(
             f"Current Accuracy: {total_accuracy}/{len(results_array)} "
             f"(Processing case {len(results_array)+1}: {claim[:50]}...)"
         )
 
-        try:
-            # Run the claim through the LangGraph pipeline
-            final_state = graph.invoke({"user_input": claim})
+        result = evaluate_case(claim, ground_truth, mode, prefetched.get(claim))
+        total_accuracy += result["accuracy"]
+        results_array.append(result)
+
+    return results_array
 
-            # Truncate tool outputs to 350 characters for compactness
-            tool_outputs_raw = final_state.get("tool_outputs", {})
-            truncated_outputs = {
-                tool: output[:350] + "…" if len(output) > 350 else output
-                for tool, output in tool_outputs_raw.items()
-            }
 
-            result = {
-                "claim": claim,
-                "ground_truth": ground_truth,
-                "selected_tools": ", ".join(final_state.get("selected_tools", [])),
-                "tools_output": json.dumps(truncated_outputs, ensure_ascii=False),
-            }
+def run_distributed(cases: list, mode: str = "full") -> list:
+    """
+    Enqueues every claim as a "verify" job and waits for workers (`python worker.py run`,
+    on this or other machines sharing JOB_QUEUE_URL) to process them. Results are scored
+    here, in case order; latency is the job's run time on its worker.
+    """
+    queue = get_job_queue()
+    claims = [claim for claim, _ in cases if claim]
+    job_ids = iter(queue.enqueue("verify", [{"claim": claim, "mode": mode} for claim in claims], queue=EVAL_QUEUE))
+    ids_by_case = [next(job_ids) if claim else None for claim, _ in cases]
+    print(f"📥 Queued {len(claims)} claims on '{EVAL_QUEUE}'; waiting for workers...")
 
-            # Extract and normalize the verdict to "True", "False", or "Unverifiable"
-            full_verdict = final_state.get("final_verdict", "")
-            verdict_text = full_verdict.lower()
-
-            if "true" in verdict_text:
-                result["verdict"] = "True"
-            elif "false" in verdict_text:
-                result["verdict"] = "False"
-            elif "unverifiable" in verdict_text:
-                result["verdict"] = "Unverifiable"
-            else:
-                result["verdict"] = "Unknown"
-
-            # Extract reasoning from the verdict, if present
-            # Prompt is such that the reasoning will start with "Reason:"
-            reason_part = ""
-            if "Reason:" in full_verdict:
-                reason_part = full_verdict.split("Reason:", 1)[1].strip()
-
-            result["reasoning"] = reason_part
-
-            # Compare with ground truth and update accuracy
-            result["accuracy"] = 1 if ground_truth.lower() == result["verdict"].lower() else 0
-            total_accuracy += result["accuracy"]
-
-        except Exception as e:
-            # Handle errors (e.g., LLM failure) and mark the case as incorrect
-            result = {
-                "claim": claim,
-                "ground_truth": ground_truth,
-                "selected_tools": "Error",
-                "tools_output": f"❌ Error: {str(e)}",
-                "verdict": "Error",
-                "reasoning": "",
-                "accuracy": 0
-            }
+    last = [-1]
 
-        # Append result for this test case
+    def report(finished: int, total: int) -> None:
+        if finished != last[0]:
+            print(f"⏳ {finished}/{total} jobs finished")
+            last[0] = finished
+
+    jobs = {job.id: job for job in wait_for_jobs(queue, [i for i in ids_by_case if i], on_progress=report)}
+
+    results_array = []
+    for (claim, ground_truth), job_id in zip(cases, ids_by_case):
+        if job_id is None:
+            results_array.append(skipped_result(ground_truth))
+            continue
+
+        job = jobs[job_id]
+        if job.status == "done":
+            final_state = {
+                **job.result,
+                "tool_outputs": {
+                    tool: [Evidence(**record) for record in records]
+                    for tool, records in job.result["tool_outputs"].items()
+                },
+            }
+            result = score_state(claim, ground_truth, final_state)
+        else:
+            result = error_result(claim, ground_truth, job.error)
+        result["latency_s"] = round(job.finished_at - job.started_at, 2)
         results_array.append(result)
 
-# === Final summary ===
-accuracy_percentage = total_accuracy / len(results_array) * 100
-print(f"✅ Evaluation complete: {len(results_array)} cases | Accuracy: {accuracy_percentage:.2f}%")
+    return results_array
+
+
+def write_csv(path: str, rows: list) -> None:
+    with open(path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_tier(spec: str) -> dict:
+    """
+    Parses "router=gpt-4o-mini,summary=gpt-4o-mini,verdict=gpt-4o" (role or role.tool keys).
+    """
+    return dict(part.strip().split("=", 1) for part in spec.split(",") if part.strip())
+
+
+def summarize_run(label: str, results_array: list, usage: dict) -> dict:
+    """
+    Builds one report row: accuracy against latency, LLM calls, tokens and estimated cost,
+    plus how much extraction/tokenization went through the CPU pool and its peak queue depth,
+    how often speculative tool runs matched the router's choice, and how many router/verdict
+    requests were answered by micro-batched calls.
+    """
+    cpu = pool_stats()
+    spec = speculation_stats()
+    batches = batch_stats().values()
+    latencies = sorted(r["latency_s"] for r in results_array if r["verdict"] != "Skipped")
+    cost = estimate_cost(usage)
+    return {
+        "run": label,
+        "accuracy": round(sum(r["accuracy"] for r in results_array) / len(results_array) * 100, 2),
+        "avg_latency_s": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "p95_latency_s": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        "llm_calls": int(sum(s["calls"] for s in usage.values())),
+        "input_tokens": int(sum(s["input_tokens"] for s in usage.values())),
+        "output_tokens": int(sum(s["output_tokens"] for s in usage.values())),
+        "est_cost_usd": round(cost, 4) if cost is not None else "n/a",
+        "cpu_offloaded": cpu["offloaded"],
+        "cpu_peak_queue": cpu["peak_queue"],
+        "spec_hit_rate": spec["hit_rate"],
+        "spec_coverage": spec["coverage"],
+        "llm_batched": sum(b["batched"] for b in batches),
+        "llm_batch_fallbacks": sum(b["fallbacks"] for b in batches),
+    }
+
+
+def print_report(report: list) -> None:
+    for row in report:
+        print(
+            f"📊 {row['run']} → accuracy {row['accuracy']}% | avg {row['avg_latency_s']}s "
+            f"| p95 {row['p95_latency_s']}s | LLM calls {row['llm_calls']} "
+            f"| tokens {row['input_tokens']}+{row['output_tokens']} | cost ${row['est_cost_usd']} "
+            f"| CPU pool {row['cpu_offloaded']} tasks, peak queue {row['cpu_peak_queue']} "
+            f"| speculation hit rate {row['spec_hit_rate']}, coverage {row['spec_coverage']} "
+            f"| batched LLM requests {row['llm_batched']} ({row['llm_batch_fallbacks']} fallbacks)"
+        )
+
+
+def compare_tiers(cases: list, tiers: list, mode: str = "full") -> list:
+    """
+    Runs the evaluation once per tier and summarises accuracy, latency and token cost.
+    """
+    # Evidence reused from an earlier tier would carry that tier's summaries
+    evidence_index.INDEX_ENABLED = False
+
+    report = []
+    base, ext = os.path.splitext(EVAL_OUTPUT)
+    for spec in tiers:
+        overrides = parse_tier(spec)
+        print(f"\n🧪 Tier: {spec}")
+
+        reset_usage()
+        reset_pool_stats()
+        reset_speculation_stats()
+        reset_batch_stats()
+        with model_overrides(overrides):
+            results_array = run_evaluation(cases, mode)
+
+        label = "_".join(f"{role}-{model}" for role, model in overrides.items())
+        write_csv(f"{base}_{label}{ext}", results_array)
+        report.append(summarize_run(spec, results_array, usage_snapshot()))
+
+    return report
+
+
+def compare_modes(cases: list) -> list:
+    """
+    Runs the evaluation in full and fast mode and summarises accuracy against latency.
+    """
+    # Evidence reused across modes would hide the difference being measured
+    evidence_index.INDEX_ENABLED = False
+
+    report = []
+    base, ext = os.path.splitext(EVAL_OUTPUT)
+    for mode in ("full", "fast"):
+        print(f"\n🧪 Mode: {mode}")
+
+        reset_usage()
+        reset_pool_stats()
+        reset_speculation_stats()
+        reset_batch_stats()
+        results_array = run_evaluation(cases, mode)
+
+        write_csv(f"{base}_{mode}{ext}", results_array)
+        report.append(summarize_run(mode, results_array, usage_snapshot()))
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate Truth Chain verdicts against ground truth.")
+    parser.add_argument(
+        "--tiers", nargs="*", metavar="SPEC",
+        help="Compare model tiers, e.g. 'router=gpt-4o-mini,summary=gpt-4o-mini,verdict=gpt-4o'. "
+             "Without SPEC, compares the default tier set."
+    )
+    parser.add_argument(
+        "--mode", choices=["full", "fast", "compare"], default="full",
+        help="full: LLM summaries (default); fast: local claim-ranked passages; compare: run both."
+    )
+    parser.add_argument(
+        "--google-batch", type=int, default=0, metavar="N",
+        help="Prefetch Google results for N claims at a time with one Serper batch request."
+    )
+    parser.add_argument(
+        "--snippet-only", action="store_true",
+        help="With --google-batch, use Serper snippets as Google evidence without fetching articles."
+    )
+    parser.add_argument(
+        "--distributed", action="store_true",
+        help="Queue the claims as jobs for worker.py processes instead of running them here."
+    )
+    args = parser.parse_args()
+
+    cases = load_cases(EVAL_INPUT)
+
+    if args.tiers is not None:
+        report = compare_tiers(cases, args.tiers or DEFAULT_TIERS, "fast" if args.mode == "fast" else "full")
+        print_report(report)
+        write_csv(EVAL_TIER_OUTPUT, report)
+    elif args.mode == "compare":
+        report = compare_modes(cases)
+        print_report(report)
+        write_csv(EVAL_MODE_OUTPUT, report)
+    else:
+        if args.distributed:
+            results_array = run_distributed(cases, args.mode)
+        else:
+            results_array = run_evaluation(cases, args.mode, args.google_batch, args.snippet_only)
+
+        # === Final summary ===
+        total_accuracy = sum(r["accuracy"] for r in results_array)
+        accuracy_percentage = total_accuracy / len(results_array) * 100
+        print(f"✅ Evaluation complete: {len(results_array)} cases | Accuracy: {accuracy_percentage:.2f}%")
 
-# === Save results to CSV ===
-output_file = EVAL_OUTPUT
-with open(output_file, mode="w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=results_array[0].keys())
-    writer.writeheader()
-    writer.writerows(results_array)
+        # === Save results to CSV ===
+        write_csv(EVAL_OUTPUT, results_array)
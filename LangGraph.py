@@ -1,10 +1,18 @@
 # claim_verification_graph.py
 
 # --- Imports ---
-from typing import List, Optional, TypedDict
+import re
+import ast
+from typing import Dict, List, Optional, Tuple, TypedDict
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from llm_pool import invoke_llm
+from llm_batcher import (LLM_BATCH_MAX_ROUTER, LLM_BATCH_MAX_VERDICT, LLM_BATCH_VERDICTS,
+                         LLM_BATCH_WINDOW_MS, MicroBatcher)
+from evidence import Evidence, evidence_to_context
+from evidence_index import INDEX_ERRORS, get_evidence_index
+from resilience import request_budget
+from speculation import Speculation, routing_history, speculate
 
 # Tool imports
 from Tools.google_search import google_search
@@ -13,69 +21,149 @@ from Tools.pubmed_tool import pubmed_search
 from Tools.tavily_search import tavily_search
 from Tools.wikipedia_search import wikipedia_summary
 
-# Load API keys
+# Load API keys (router/verdict models are configured per node, see llm_pool.py)
 load_dotenv()
-llm = ChatOpenAI(model="gpt-4", temperature=0)
 
 # --- Graph State Definition ---
 class GraphState(TypedDict):
     """Shared state structure passed between LangGraph nodes."""
     user_input: str
     selected_tools: Optional[List[str]]
-    tool_outputs: Optional[dict]
+    tool_outputs: Optional[Dict[str, List[Evidence]]]  # tool name -> evidence records
     final_verdict: Optional[str]
+    mode: Optional[str]  # "full" (LLM summaries, default) or "fast" (claim-ranked passages)
+    prefetched: Optional[Dict[str, List[Evidence]]]  # tool outputs gathered ahead of the run (e.g. batched)
+    serper_results: Optional[List[Evidence]]  # raw Google results gathered ahead of the run; articles fetched only if Google is selected
+    prior_evidence: Optional[Dict[str, List[Evidence]]]  # evidence of near-duplicate earlier claims found while routing
+    speculation: Optional[Speculation]  # tool runs started while routing
 
 
 # --- Tool Selection Node ---
-def decide_tools_node(input: GraphState) -> GraphState:
-    """
-    Uses LLM to select appropriate tools for the given claim.
-
-    - Takes user_input from GraphState
-    - Sends system prompt to LLM with classification task
-    - Returns selected_tools list (e.g., ["Google", "PubMed"])
-    """
-    user_claim = input.get("user_input", "")
-
-    system_prompt = """
-You are a smart classifier. Given a user's information or claim, identify which sources/tools are best to verify it.
+ROUTER_TOOLS = """
 Available tools:
 - Google 
 - PubMed 
 - Wikipedia 
 - Tavily search 
 - Arxiv
+"""
+
+
+def _route_single(user_claim: str) -> List[str]:
+    system_prompt = f"""
+You are a smart classifier. Given a user's information or claim, identify which sources/tools are best to verify it.
+{ROUTER_TOOLS.strip()}
 
 Return a Python list of tool names most relevant for verifying the information.
 Only return tool names. Do not include explanation.
 If unsure, return ['Google'] as fallback.
 """
 
-    response = llm.invoke([
+    response = invoke_llm("router", [
         HumanMessage(content=system_prompt.strip()),
         HumanMessage(content=user_claim)
     ])
 
-    import ast
     try:
         tools = ast.literal_eval(response.content.strip())
         assert isinstance(tools, list)
     except Exception:
         tools = ["Google"]  # Fallback if parsing fails
+    return tools
+
+
+def _route_batch(claims: List[str]) -> List[List[str]]:
+    """
+    Routes several concurrent claims with one router call.
+
+    Raises:
+        ValueError: If the response does not give a tool list for every claim.
+    """
+    system_prompt = f"""
+You are a smart classifier. You receive several numbered claims. For each claim independently, identify which sources/tools are best to verify it.
+{ROUTER_TOOLS.strip()}
+
+Return a Python dict mapping each claim number to its list of tool names, e.g. {{1: ['Google'], 2: ['PubMed', 'Google']}}.
+Include every claim number. Only return the dict. Do not include explanation.
+If unsure about a claim, use ['Google'] for it.
+"""
+
+    numbered = "\n".join(f"{i}. {claim}" for i, claim in enumerate(claims, start=1))
+    response = invoke_llm("router", [
+        HumanMessage(content=system_prompt.strip()),
+        HumanMessage(content=numbered)
+    ])
+
+    try:
+        answers = ast.literal_eval(response.content.strip())
+    except Exception as e:
+        raise ValueError(f"unparseable batched routing response: {e}") from e
+    if not isinstance(answers, dict) or not all(isinstance(answers.get(i), list) for i in range(1, len(claims) + 1)):
+        raise ValueError("batched routing response is missing claims")
+    return [answers[i] for i in range(1, len(claims) + 1)]
+
+
+# Routing calls from concurrent claims share one prompt (see llm_batcher.py)
+_router_batcher = MicroBatcher("router", _route_batch, _route_single, max_batch=LLM_BATCH_MAX_ROUTER)
+
+
+def route_tools(user_claim: str) -> List[str]:
+    """
+    Asks the router LLM which tools to use for a claim (or a group of claims)
+    and records the choice in the routing history used for speculation.
+    Concurrent calls are micro-batched into one router request.
+    """
+    tools = _router_batcher.submit(user_claim)
+    routing_history().record(tools)
+    return tools
+
+
+def decide_tools_node(input: GraphState) -> GraphState:
+    """
+    Uses LLM to select appropriate tools for the given claim.
+
+    - Takes user_input from GraphState
+    - Starts the tools most often selected in the past (speculatively, see speculation.py)
+      so their network I/O overlaps the routing call
+    - Sends system prompt to LLM with classification task
+    - Returns selected_tools list (e.g., ["Google", "PubMed"])
+    """
+    user_claim = input.get("user_input", "")
+
+    # Evidence already indexed or prefetched needs no speculative run
+    prior_evidence = _prior_evidence(user_claim, input.get("mode") or "full")
+    covered = {_output_key(t) for t in [*prior_evidence, *(input.get("prefetched") or {})]}
+
+    state = {**input, "user_input": user_claim}
+    speculation = speculate(
+        user_claim,
+        lambda tool: _run_speculative(tool, state),
+        skip=frozenset(t for t in TOOL_NAMES if _output_key(t) in covered),
+    )
 
     return {
         "user_input": user_claim,
-        "selected_tools": tools
+        "selected_tools": route_tools(user_claim),
+        "prior_evidence": prior_evidence,
+        "speculation": speculation,
     }
 
 
 # --- Individual Tool Nodes ---
+def _is_fast(state: GraphState) -> bool:
+    """
+    True when the run uses fast mode (local passage extraction instead of LLM summaries).
+    """
+    return state.get("mode") == "fast"
+
+
 def google_node(state: GraphState) -> GraphState:
     """
     Runs Google search for the claim and updates tool_outputs.
+    Raw results from a batched search (serper_results) save the Serper request.
     """
     query = state["user_input"]
-    result = google_search(query)
+    result = google_search(query, fast=_is_fast(state), serper_results=state.get("serper_results"))
 
     prev_outputs = state.get("tool_outputs", {})
     updated_outputs = {**prev_outputs, "Google": result}
@@ -87,7 +175,7 @@ def pubmed_node(state: GraphState) -> GraphState:
     Runs PubMed search for the claim and updates tool_outputs.
     """
     query = state["user_input"]
-    result = pubmed_search(query, query)
+    result = pubmed_search(query, query, fast=_is_fast(state))
 
     prev_outputs = state.get("tool_outputs", {})
     updated_outputs = {**prev_outputs, "PubMed": result}
@@ -111,7 +199,7 @@ def wikipedia_node(state: GraphState) -> GraphState:
     Runs Wikipedia search for the claim and updates tool_outputs.
     """
     query = state["user_input"]
-    result = wikipedia_summary(query)
+    result = wikipedia_summary(query, fast=_is_fast(state))
 
     prev_outputs = state.get("tool_outputs", {})
     updated_outputs = {**prev_outputs, "Wikipedia": result}
@@ -123,7 +211,7 @@ def arxiv_node(state: GraphState) -> GraphState:
     Runs Arxiv search for the claim and updates tool_outputs.
     """
     query = state["user_input"]
-    result = arxiv_summary(query, query)
+    result = arxiv_summary(query, query, fast=_is_fast(state))
 
     prev_outputs = state.get("tool_outputs", {})
     updated_outputs = {**prev_outputs, "Arxiv": result}
@@ -131,30 +219,128 @@ def arxiv_node(state: GraphState) -> GraphState:
 
 
 # --- Tool Dispatcher Node ---
+TOOL_NAMES = ["Google", "PubMed", "Tavily search", "Wikipedia", "Arxiv"]
+
+
+def _output_key(tool: str) -> str:
+    """
+    tool_outputs key for a router tool name.
+    """
+    return "Tavily" if tool == "Tavily search" else tool
+
+
+def _run_tool(tool: str, state: GraphState) -> Dict[str, List[Evidence]]:
+    """
+    Runs one tool by its router name and returns its tool_outputs ({} for unknown tools).
+    """
+    if tool == "Google":
+        result = google_node(state)
+    elif tool == "PubMed":
+        result = pubmed_node(state)
+    elif tool == "Tavily search":
+        result = tavily_node(state)
+    elif tool == "Wikipedia":
+        result = wikipedia_node(state)
+    elif tool == "Arxiv":
+        result = arxiv_node(state)
+    else:
+        return {}  # Skip unknown tools
+    return result.get("tool_outputs", {})
+
+
+def _run_speculative(tool: str, state: GraphState) -> Dict[str, List[Evidence]]:
+    # Speculative runs start before RunTools, so they get a request budget of their own
+    with request_budget():
+        return _run_tool(tool, {**state, "tool_outputs": {}})
+
+
+# --- Evidence Index Access ---
+# The index is an optimisation: if it fails, tools run as if it were empty
+RELATED_KEY = "Earlier claims"  # tool_outputs key for related evidence used as extra context
+
+
+def _prior_evidence(claim: str, mode: str) -> Dict[str, List[Evidence]]:
+    """
+    Evidence gathered in the same mode for near-duplicate earlier claims, by tool.
+    """
+    index = get_evidence_index()
+    try:
+        return index.lookup(claim, mode) if index is not None else {}
+    except INDEX_ERRORS:
+        return {}
+
+
+def _related_evidence(claim: str, mode: str) -> List[Evidence]:
+    index = get_evidence_index()
+    try:
+        return index.related(claim, mode) if index is not None else []
+    except INDEX_ERRORS:
+        return []
+
+
+def _remember(tool_outputs: Dict[str, List[Evidence]], claim: str, mode: str) -> None:
+    """
+    Makes fresh evidence available to later, related claims.
+    """
+    index = get_evidence_index()
+    if index is None:
+        return
+    for key, records in tool_outputs.items():
+        try:
+            index.add(key, claim, records, mode)
+        except INDEX_ERRORS:
+            return
+
+
 def run_selected_tools(state: GraphState) -> GraphState:
     """
     Dispatches execution of tools selected in the previous node.
 
+    Tools whose evidence was gathered for a near-duplicate earlier claim are skipped.
+    Evidence of merely similar earlier claims is added as extra context under
+    RELATED_KEY, while the tools still run. Tools already started speculatively are
+    awaited instead of run again; finished speculative runs of tools the router did
+    not select go to the evidence index.
+
     Returns updated state with tool_outputs populated from tools.
     """
     tools = state.get("selected_tools", [])
+    claim = state["user_input"]
+    mode = state.get("mode") or "full"
     merged_output = {}
 
-    for tool in tools:
-        if tool == "Google":
-            result = google_node(state)
-        elif tool == "PubMed":
-            result = pubmed_node(state)
-        elif tool == "Tavily search":
-            result = tavily_node(state)
-        elif tool == "Wikipedia":
-            result = wikipedia_node(state)
-        elif tool == "Arxiv":
-            result = arxiv_node(state)
-        else:
-            continue  # Skip unknown tools
-
-        merged_output.update(result.get("tool_outputs", {}))
+    prior_evidence = state.get("prior_evidence")
+    if prior_evidence is None:
+        prior_evidence = _prior_evidence(claim, mode)
+    related = _related_evidence(claim, mode)  # before this run's evidence is indexed
+    prefetched = state.get("prefetched") or {}
+    speculation = state.get("speculation")
+    needed = []
+
+    # All provider calls below share one deadline; slow providers fail over to fallbacks
+    with request_budget():
+        for tool in tools:
+            output_key = _output_key(tool)
+            if output_key in prior_evidence:
+                merged_output[output_key] = prior_evidence[output_key]
+                continue
+
+            if output_key in prefetched:
+                tool_outputs = {output_key: prefetched[output_key]}
+            else:
+                needed.append(tool)
+                tool_outputs = (speculation.take(tool) if speculation is not None else None) or _run_tool(tool, state)
+
+            merged_output.update(tool_outputs)
+            _remember(tool_outputs, claim, mode)
+
+    seen = {record.url for records in merged_output.values() for record in records if record.url}
+    related = [record for record in related if not record.url or record.url not in seen]
+    if related:
+        merged_output[RELATED_KEY] = related
+
+    if speculation is not None:
+        speculation.finish(needed, keep=lambda outputs: _remember(outputs, claim, mode))
 
     return {
         "user_input": state["user_input"],
@@ -164,23 +350,7 @@ def run_selected_tools(state: GraphState) -> GraphState:
 
 
 # --- Final Verdict Node ---
-def evaluate_claim_node(state: GraphState) -> GraphState:
-    """
-    Uses an LLM to evaluate the claim based on tool_outputs.
-
-    Returns final_verdict in the format:
-    Verdict: [True / False / Unverifiable]
-    Reason: <summary>
-    """
-    claim = state["user_input"]
-    tool_outputs = state.get("tool_outputs", {})
-
-    # Format context for LLM
-    context_text = "\n\n".join(
-        [f"🔎 Source: {tool}\n{output}" for tool, output in tool_outputs.items()]
-    )
-
-    system_prompt = """
+VERDICT_PROMPT = """
 You are a fact verification assistant. Given a claim and search results from various sources (Google, PubMed, Wikipedia, etc.), determine whether the claim is:
 
 - ✅ TRUE: Clearly supported by the evidence
@@ -195,14 +365,87 @@ Verdict: [True / False / Unverifiable]
 Reason: <short explanation based only on context>
 """
 
+# Fast mode context is raw excerpts rather than focused summaries
+FAST_CONTEXT_NOTE = """
+The context consists of raw excerpts extracted from each source, not summaries.
+Some excerpts may be only partially relevant; reason over the passages that address the claim.
+"""
+
+_VERDICT_HEADER = re.compile(r"^=+ *Claim (\d+) *=+ *$", re.MULTILINE)
+
+
+def _verdict_prompt(fast: bool) -> str:
+    return VERDICT_PROMPT + (FAST_CONTEXT_NOTE if fast else "")
+
+
+def _verdict_single(item: Tuple[str, str], fast: bool = False) -> str:
+    claim, context_text = item
     user_message = f"Claim: {claim}\n\nContext:\n{context_text}"
 
-    response = llm.invoke([
+    response = invoke_llm("verdict", [
+        HumanMessage(content=_verdict_prompt(fast).strip()),
+        HumanMessage(content=user_message.strip())
+    ])
+    return response.content.strip()
+
+
+def _verdict_batch(items: List[Tuple[str, str]], fast: bool = False) -> List[str]:
+    """
+    Judges several concurrent claims, each against its own context, with one verdict call.
+
+    Raises:
+        ValueError: If the response does not contain a verdict section for every claim.
+    """
+    system_prompt = _verdict_prompt(fast) + """
+You receive several numbered claims, each with its own context. Judge each claim only against its own context.
+Answer every claim in order. Start each answer with a line "=== Claim <number> ===", followed by its Verdict and Reason lines.
+"""
+
+    user_message = "\n\n".join(
+        f"=== Claim {i} ===\nClaim: {claim}\n\nContext:\n{context_text}"
+        for i, (claim, context_text) in enumerate(items, start=1)
+    )
+    response = invoke_llm("verdict", [
         HumanMessage(content=system_prompt.strip()),
         HumanMessage(content=user_message.strip())
     ])
 
-    return {**state, "final_verdict": response.content.strip()}
+    parts = _VERDICT_HEADER.split(response.content)
+    answers = {int(number): body.strip() for number, body in zip(parts[1::2], parts[2::2])}
+    if not all("Verdict:" in answers.get(i, "") for i in range(1, len(items) + 1)):
+        raise ValueError("batched verdict response is missing claims")
+    return [answers[i] for i in range(1, len(items) + 1)]
+
+
+# Verdict prompts carry each claim's full context, so batching them is opt-in (LLM_BATCH_VERDICTS)
+_verdict_batchers = {
+    fast: MicroBatcher(
+        f"verdict.{'fast' if fast else 'full'}",
+        lambda items, fast=fast: _verdict_batch(items, fast),
+        lambda item, fast=fast: _verdict_single(item, fast),
+        window_ms=LLM_BATCH_WINDOW_MS if LLM_BATCH_VERDICTS else 0,
+        max_batch=LLM_BATCH_MAX_VERDICT,
+    )
+    for fast in (False, True)
+}
+
+
+def evaluate_claim_node(state: GraphState) -> GraphState:
+    """
+    Uses an LLM to evaluate the claim based on tool_outputs.
+
+    Returns final_verdict in the format:
+    Verdict: [True / False / Unverifiable]
+    Reason: <summary>
+    """
+    claim = state["user_input"]
+    tool_outputs = state.get("tool_outputs", {})
+
+    # Format context for LLM (deduplicated and budgeted across tools)
+    context_text = evidence_to_context(tool_outputs)
+
+    verdict = _verdict_batchers[_is_fast(state)].submit((claim, context_text))
+    return {**state, "final_verdict": verdict}
 
 
 # --- LangGraph Assembly ---
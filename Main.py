@@ -1,12 +1,59 @@
 # Main.py
 
 import streamlit as st
-from LangGraph import graph  # Import compiled LangGraph
+from app_jobs import APP_HISTORY_SIZE, STEP_LABELS, result_key, shared_executor, submit_job
+from evidence import render_evidence
 from typing import Dict
 
 # --- Page Config ---
 st.set_page_config(page_title="Truth Chain", layout="wide")  # Full-width layout for better readability
 
+
+# --- Session State ---
+# Verifications run on one bounded executor shared by all sessions and pages (app_jobs.py),
+# so reruns stay fast and many concurrent users queue instead of blocking the server.
+# Results survive reruns, and re-showing a past claim reads from here instead of re-verifying.
+st.session_state.setdefault("jobs", {})      # result key -> running VerificationJob
+st.session_state.setdefault("results", {})   # result key -> final graph state
+st.session_state.setdefault("history", [])   # result keys, most recent first
+st.session_state.setdefault("shown", None)   # result key currently displayed
+st.session_state.setdefault("errors", [])    # (claim, message) of failed jobs, shown once
+
+
+def remember(key: tuple, final_state: Dict) -> None:
+    # Keep the last APP_HISTORY_SIZE results for this session
+    history = [k for k in st.session_state.history if k != key]
+    history.insert(0, key)
+    for old in history[APP_HISTORY_SIZE:]:
+        st.session_state.results.pop(old, None)
+    st.session_state.history = history[:APP_HISTORY_SIZE]
+    st.session_state.results[key] = final_state
+    st.session_state.shown = key
+
+
+def show(key: tuple) -> None:
+    st.session_state.shown = key
+
+
+def render_result(final_state: Dict) -> None:
+    # --- Verdict Display ---
+    verdict = final_state.get("final_verdict", "No verdict available.")
+    st.subheader("📣 Verdict")
+    st.markdown(f"**{final_state.get('user_input', '')}**")
+    st.success(verdict if "✅" in verdict else verdict)  # Display verdict with ✅ or ❌ as visual cue
+
+    # --- Selected Tools Display ---
+    st.subheader("🔧 Tools Used")
+    st.write(", ".join(final_state.get("selected_tools", [])))
+
+    # --- Source Outputs (Expandable by Tool) ---
+    st.subheader("📚 Source Outputs")
+    tool_outputs = final_state.get("tool_outputs", {})
+    for tool, records in tool_outputs.items():
+        with st.expander(f"{tool} Output"):
+            st.markdown(render_evidence(records))
+
+
 # --- App Title and Description ---
 st.markdown("## 🧠 Truth Chain: AI Claim Analyzer with Multi-Source Tools")
 st.markdown("##### Multi-tool powered: Google, Wikipedia, PubMed, Arxiv, Tavily")
@@ -19,34 +66,69 @@ Enter a factual claim below and check if it is **True**, **False**, or **Unverif
 
 # --- User Input Section ---
 user_claim = st.text_input("💬 Enter your claim here:", placeholder="e.g. ChatGPT passed the bar exam")
+fast_mode = st.toggle(
+    "⚡ Fast mode",
+    help="Skip per-article LLM summaries and reason directly over claim-ranked passages. Faster, slightly less precise."
+)
 
 # --- On Verify Button Click ---
 if st.button("🔎 Verify Claim"):
     if user_claim.strip():
-        # Show loading spinner while verification runs
-        with st.spinner("Verifying..."):
-            # Run the LangGraph pipeline with user input
-            final_state: Dict = graph.invoke({"user_input": user_claim.strip()})
-
-        # --- Verdict Display ---
-        verdict = final_state.get("final_verdict", "No verdict available.")
-        st.subheader("📣 Verdict")
-        st.success(verdict if "✅" in verdict else verdict)  # Display verdict with ✅ or ❌ as visual cue
-
-        # --- Selected Tools Display ---
-        st.subheader("🔧 Tools Used")
-        st.write(", ".join(final_state.get("selected_tools", [])))
-
-        # --- Source Outputs (Expandable by Tool) ---
-        st.subheader("📚 Source Outputs")
-        tool_outputs = final_state.get("tool_outputs", {})
-        for tool, output in tool_outputs.items():
-            with st.expander(f"{tool} Output"):
-                st.markdown(output)
+        mode = "fast" if fast_mode else "full"
+        key = result_key(user_claim, mode)
+        if key in st.session_state.results:
+            remember(key, st.session_state.results[key])  # already verified this session
+        elif key not in st.session_state.jobs:
+            st.session_state.jobs[key] = submit_job(shared_executor(), user_claim.strip(), mode)
     else:
         st.warning("⚠️ Please enter a claim before clicking verify.")
 
 
+# --- Running Jobs (polled while any are in flight) ---
+@st.fragment(run_every=1.0 if st.session_state.jobs else None)
+def poll_jobs() -> None:
+    finished = False
+    for key, job in list(st.session_state.jobs.items()):
+        if job.done:
+            del st.session_state.jobs[key]
+            finished = True
+            error = job.future.exception()
+            if error is not None:
+                st.session_state.errors.append((job.claim, str(error)))
+            else:
+                remember(key, job.future.result())
+            continue
+
+        if not job.started:
+            status = "⏳ Queued"
+        else:
+            status = " → ".join(STEP_LABELS.get(step, step) for step in job.steps) or "🧭 Selecting tools..."
+        st.info(f"**{job.claim}** ({job.mode}): {status}")
+
+    if finished:
+        st.rerun()  # full rerun so the new result and history render
+
+
+poll_jobs()
+
+for claim, message in st.session_state.errors:
+    st.error(f"❌ Verification failed for \"{claim}\": {message}")
+st.session_state.errors = []
+
+if st.session_state.shown in st.session_state.results:
+    render_result(st.session_state.results[st.session_state.shown])
+
+# --- Recent Claims (this session) ---
+with st.sidebar:
+    st.markdown("### 🕘 Recent Claims")
+    if not st.session_state.history:
+        st.caption("Verified claims appear here.")
+    for key in st.session_state.history:
+        claim = st.session_state.results[key].get("user_input", key[0])
+        label = f"{claim} ⚡" if key[1] == "fast" else claim
+        st.button(label, key=f"history-{key[1]}-{key[0]}", on_click=show, args=(key,), use_container_width=True)
+
+
 # --- Sample Claims for User Reference ---
 with st.expander("💡 Try Sample Claims (with Verdicts & Reasoning)"):
     samples = [
@@ -0,0 +1,96 @@
+# arxiv_store.py
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+# === Store Location ===
+# One SQLite file holds every paper that has been downloaded and parsed once.
+STORE_PATH = os.getenv("ARXIV_STORE_PATH", os.path.join(".cache", "arxiv_papers.sqlite3"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id       TEXT PRIMARY KEY,   -- arXiv ID with version, e.g. 2303.08774v6
+    text_z         BLOB NOT NULL,      -- zlib-compressed full text
+    sections       TEXT NOT NULL,      -- JSON {section: [start, end]} character offsets
+    section_tokens TEXT NOT NULL,      -- JSON {section: token_count}
+    total_tokens   INTEGER NOT NULL,
+    stored_at      REAL NOT NULL
+)
+"""
+
+
+# === Stored Paper Record ===
+@dataclass(slots=True)
+class StoredPaper:
+    """
+    Full text of an arXiv paper plus its precomputed section index.
+    """
+    paper_id: str
+    text: str
+    sections: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    total_tokens: int = 0
+
+    def section(self, name: str) -> str:
+        """
+        Returns the text of an indexed section ("" if the paper has no such section).
+        """
+        span = self.sections.get(name)
+        return self.text[span[0]:span[1]] if span else ""
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(_SCHEMA)
+    return conn
+
+
+# === Read / Write ===
+def get_paper(paper_id: str, path: str = STORE_PATH) -> Optional[StoredPaper]:
+    """
+    Loads a paper from the local store, or returns None if it has not been stored yet.
+    """
+    with closing(_connect(path)) as conn:
+        row = conn.execute(
+            "SELECT text_z, sections, section_tokens, total_tokens FROM papers WHERE paper_id = ?",
+            (paper_id,),
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    text_z, sections, section_tokens, total_tokens = row
+    return StoredPaper(
+        paper_id=paper_id,
+        text=zlib.decompress(text_z).decode("utf-8"),
+        sections={name: tuple(span) for name, span in json.loads(sections).items()},
+        section_tokens=json.loads(section_tokens),
+        total_tokens=total_tokens,
+    )
+
+
+def put_paper(paper: StoredPaper, path: str = STORE_PATH) -> None:
+    """
+    Saves (or replaces) a paper and its section index in the local store.
+    """
+    with closing(_connect(path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO papers VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                paper.paper_id,
+                zlib.compress(paper.text.encode("utf-8"), 6),
+                json.dumps(paper.sections),
+                json.dumps(paper.section_tokens),
+                paper.total_tokens,
+                time.time(),
+            ),
+        )
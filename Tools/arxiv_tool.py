@@ -1,85 +1,208 @@
+import os
+import re
 import arxiv
-import fitz  # PyMuPDF
-import tempfile
-import requests
+import sqlite3
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from utils import summarize_article_with_focus
-import tiktoken  
+from evidence import Evidence, error_evidence
+from Tools.arxiv_store import StoredPaper, get_paper, put_paper
+from resilience import guarded_call
+from utils import summarize_article_with_focus, relevance_score, extract_passages
+from utils import PDF_MAX_BYTES, extract_pdf_text, fetch_document
+from cpu_pool import run_cpu, token_count
+
+# === Abstract Triage Thresholds ===
+# Abstracts scoring at or above SUFFICIENT answer the claim on their own;
+# below MIN_RELEVANCE the paper is off-topic and its PDF is not worth fetching.
+ABSTRACT_SUFFICIENT = float(os.getenv("ARXIV_ABSTRACT_SUFFICIENT", "0.6"))
+ABSTRACT_MIN_RELEVANCE = float(os.getenv("ARXIV_ABSTRACT_MIN_RELEVANCE", "0.2"))
+ARXIV_TIMEOUT = float(os.getenv("ARXIV_TIMEOUT_SECONDS", "20"))
+ARXIV_PDF_TIMEOUT = float(os.getenv("ARXIV_PDF_TIMEOUT_SECONDS", "45"))
 
 
 # === Token Counter ===
 def count_tokens(text: str, model: str = "gpt-4o") -> int:
     """
     Count the number of tokens in the given text using the tokenizer for the specified model.
-    Useful for managing LLM input limits.
+    Useful for managing LLM input limits. Long texts are encoded in the CPU pool.
     """
-    enc = tiktoken.encoding_for_model(model)
-    return len(enc.encode(text or ""))
+    return run_cpu(token_count, text or "", model, size=len(text or ""))
 
 
-# === Section Extractor ===
-def extract_focus_sections(full_text: str) -> str:
+# === Section Index ===
+# Headings on their own line, optionally numbered ("1 Introduction", "IV. METHODS").
+_HEADING_RE = re.compile(
+    r"^[ \t]*(?:(?:\d+(?:\.\d+)*|[IVX]+)\.?[ \t]+)?"
+    r"(introduction|related work|background|methods?|methodology|approach|experiments?|results|"
+    r"discussion|conclusions?|summary|acknowledge?ments?|references|bibliography)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Heading keyword -> canonical section name (unlisted headings only end other sections)
+_CANONICAL_SECTIONS = {
+    "introduction": "introduction",
+    "method": "methods", "methods": "methods", "methodology": "methods", "approach": "methods",
+    "conclusion": "conclusion", "conclusions": "conclusion",
+    "discussion": "conclusion", "summary": "conclusion",
+    "references": "references", "bibliography": "references",
+}
+
+
+def index_sections(full_text: str) -> Dict[str, Tuple[int, int]]:
     """
-    Extract key sections (Introduction, Conclusion) from a long research paper
-    to reduce token usage while retaining essential information.
+    Build a one-time index of section offsets (introduction, methods, conclusion, references).
+
+    Each section runs from its heading to the next recognised heading. If a paper has no
+    line-level Introduction/Conclusion headings, falls back to a keyword search of the text.
     """
+    headings = [(m.start(), m.group(1).lower()) for m in _HEADING_RE.finditer(full_text)]
+    sections = {}
+
+    for i, (start, keyword) in enumerate(headings):
+        name = _CANONICAL_SECTIONS.get(keyword)
+        if not name or name in sections:
+            continue
+        end = headings[i + 1][0] if i + 1 < len(headings) else len(full_text)
+        sections[name] = (start, end)
+
+    # Fallback for papers whose headings are not on their own line
     lower = full_text.lower()
-    sections = []
 
-    def get_section(start_keywords, end_keywords=None):
+    def find_span(start_keywords, end_keywords):
         for start_kw in start_keywords:
             start_idx = lower.find(start_kw)
             if start_idx != -1:
-                if end_keywords:
-                    for end_kw in end_keywords:
-                        end_idx = lower.find(end_kw, start_idx + 1)
-                        if end_idx != -1:
-                            return full_text[start_idx:end_idx]
+                for end_kw in end_keywords:
+                    end_idx = lower.find(end_kw, start_idx + 1)
+                    if end_idx != -1:
+                        return (start_idx, end_idx)
                 # fallback: extract a chunk if no proper end found
-                return full_text[start_idx:start_idx + 3000]
-        return ""
+                return (start_idx, min(start_idx + 3000, len(full_text)))
+        return None
 
-    # Try to extract intro and conclusion (skip unrelated parts)
-    intro = get_section(
-        ["introduction"],
-        ["related work", "background", "method", "methods"]
-    )
-    conclusion = get_section(
-        ["conclusion", "discussion", "summary"],
-        ["acknowledgements", "references", "bibliography"]
-    )
+    if "introduction" not in sections:
+        span = find_span(["introduction"], ["related work", "background", "method", "methods"])
+        if span:
+            sections["introduction"] = span
+    if "conclusion" not in sections:
+        span = find_span(["conclusion", "discussion", "summary"], ["acknowledgements", "references", "bibliography"])
+        if span:
+            sections["conclusion"] = span
+
+    return sections
+
+
+# === Section Extractor ===
+# Long papers are cut down to their most useful sections, in this order, as long as the
+# stored token counts still fit the summarizer budget. References are never sent.
+ARXIV_SUMMARY_TOKEN_BUDGET = int(os.getenv("ARXIV_SUMMARY_TOKEN_BUDGET", "10000"))
+_FOCUS_SECTIONS = ("introduction", "conclusion", "methods")
+
+
+def extract_focus_sections(paper: StoredPaper, budget: int = ARXIV_SUMMARY_TOKEN_BUDGET) -> str:
+    """
+    Extract key sections (Introduction, Conclusion, then Methods) from a long research
+    paper to reduce token usage while retaining essential information.
+
+    Sections are picked by their stored token counts until the budget is spent, and are
+    sliced from the stored offsets, so the paper is neither rescanned nor re-tokenized.
+    If even the first section does not fit, it is cut to the budget's share of its length.
+
+    Args:
+        paper (StoredPaper): Paper with its section index and token counts.
+        budget (int): Maximum tokens to hand to the summarizer.
+
+    Returns:
+        str: Selected sections in reading order.
+    """
+    chosen, used = [], 0
+    for name in _FOCUS_SECTIONS:
+        if name not in paper.sections:
+            continue
+        tokens = paper.section_tokens.get(name)
+        if tokens is None:
+            tokens = count_tokens(paper.section(name))
+        if used + tokens <= budget:
+            chosen.append(name)
+            used += tokens
+
+    if not chosen:
+        # Nothing fits whole: keep the budget's share of the first section (or of the paper)
+        name = next((n for n in _FOCUS_SECTIONS if n in paper.sections), None)
+        text = paper.section(name) if name else paper.text
+        tokens = paper.section_tokens.get(name) if name else paper.total_tokens
+        if not tokens:
+            return text
+        return text[:len(text) * budget // max(tokens, budget)]
 
-    return intro + "\n\n" + conclusion
+    chosen.sort(key=lambda n: paper.sections[n][0])
+    return "\n\n".join(paper.section(name) for name in chosen)
 
 
 # === PDF Downloader & Extractor ===
 def download_arxiv_pdf(pdf_url: str) -> str:
     """
-    Downloads the PDF from ArXiv and extracts full text using PyMuPDF.
-    Returns the full text as string.
+    Downloads the PDF from ArXiv (streamed, capped at PDF_MAX_BYTES) and extracts
+    full text using PyMuPDF. Returns the full text as string.
     """
     try:
-        response = requests.get(pdf_url)
-        response.raise_for_status()
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(response.content)
-            tmp_path = tmp.name
+        doc = guarded_call(
+            "arxiv-pdf",
+            lambda: fetch_document(pdf_url, max_bytes=PDF_MAX_BYTES, timeout=ARXIV_PDF_TIMEOUT),
+        )
+        if doc.kind != "pdf":
+            return "❌ Error downloading or extracting PDF: response is not a PDF"
 
-        doc = fitz.open(tmp_path)
-        full_text = "\n".join(page.get_text() for page in doc)
-        doc.close()
-        return full_text.strip()
+        return extract_pdf_text(doc.body)
 
     except Exception as e:
         return f"❌ Error downloading or extracting PDF: {e}"
 
 
+# === Paper Loader (local store first) ===
+def load_arxiv_paper(paper_id: str, pdf_url: str) -> Optional[StoredPaper]:
+    """
+    Returns a paper's text and section index from the local store, downloading,
+    indexing and storing it on first use. Returns None if the PDF cannot be extracted.
+    """
+    try:
+        paper = get_paper(paper_id)
+        if paper is not None:
+            return paper
+    except sqlite3.Error:
+        pass  # store unavailable; fall through to a fresh download
+
+    full_text = download_arxiv_pdf(pdf_url)
+    if full_text.startswith("❌"):
+        return None
+
+    sections = index_sections(full_text)
+    paper = StoredPaper(
+        paper_id=paper_id,
+        text=full_text,
+        sections=sections,
+        section_tokens={name: count_tokens(full_text[start:end]) for name, (start, end) in sections.items()},
+        total_tokens=count_tokens(full_text),
+    )
+
+    try:
+        put_paper(paper)
+    except sqlite3.Error:
+        pass  # caching is best-effort
+
+    return paper
+
+
 # === ArXiv Summarizer Tool ===
-def arxiv_summary(query: str, focus: str, max_results: int = 1) -> str:
+def arxiv_summary(query: str, focus: str, max_results: int = 5, fast: bool = False) -> List[Evidence]:
     """
-    Search ArXiv for a given query and return a focused summary based on the full paper content.
-    Falls back to abstract if full text cannot be extracted.
+    Search ArXiv for a given query and return a focused summary of the most relevant paper.
+
+    Candidates are ranked by how well their abstracts cover the claim. The PDF of the
+    best candidate is downloaded only when its abstract is relevant but not sufficient
+    on its own; otherwise the abstract is used directly.
+    Falls back to abstract if full text cannot be extracted. With fast=True, claim-ranked
+    passages from the paper replace the LLM summary.
     """
     try:
         search = arxiv.Search(
@@ -87,44 +210,61 @@ def arxiv_summary(query: str, focus: str, max_results: int = 1) -> str:
             max_results=max_results,
             sort_by=arxiv.SortCriterion.Relevance
         )
-        results = list(search.results())
+        results = guarded_call("arxiv", lambda: list(search.results()), timeout=ARXIV_TIMEOUT)
 
         if not results:
-            return f"❌ No ArXiv results for: {query}"
+            return error_evidence("Arxiv", f"❌ No ArXiv results for: {query}")
+
+        # === Rank candidates by abstract relevance (ties keep ArXiv order) ===
+        scored = [(relevance_score(r.summary, focus), r) for r in results]
+        score, top = max(scored, key=lambda pair: pair[0])
 
-        top = results[0]
         title = top.title.strip().replace('\n', ' ')
-        authors = ", ".join([a.name for a in top.authors])
         abstract = top.summary.strip().replace('\n', ' ')
         url = top.entry_id
         date = top.published.strftime('%Y-%m-%d')
         pdf_url = top.pdf_url
 
-        # === Download full paper and summarize ===
-        full_text = download_arxiv_pdf(pdf_url)
+        if score >= ABSTRACT_SUFFICIENT or score < ABSTRACT_MIN_RELEVANCE:
+            # Abstract settles it (or the paper is off-topic): skip the PDF
+            return [Evidence(
+                source="arXiv",
+                title=title,
+                url=url,
+                date=date,
+                summary=f"(Abstract only, relevance {score:.2f})\n\n{abstract}",
+                abstract=abstract,
+            )]
+
+        # === Load full paper (local store or download) and summarize ===
+        paper = load_arxiv_paper(top.get_short_id(), pdf_url)
 
-        if full_text.startswith("❌"):
+        raw_length = 0
+        if paper is None:
             summary = f"(Fallback to abstract)\n\n{abstract}"
         else:
-            token_count = count_tokens(full_text)
-            if token_count > 10000:
-                # Extract only intro/conclusion if paper is too long
-                focus_text = extract_focus_sections(full_text)
-                summary = summarize_article_with_focus(focus_text, focus=focus)
+            raw_length = len(paper.text)
+            if fast:
+                summary = extract_passages(paper.text, focus=focus)
+            elif paper.total_tokens > ARXIV_SUMMARY_TOKEN_BUDGET:
+                # Send only the key sections that fit the budget if the paper is too long
+                focus_text = extract_focus_sections(paper)
+                summary = summarize_article_with_focus(focus_text, focus=focus, tool="Arxiv")
             else:
-                summary = summarize_article_with_focus(full_text, focus=focus)
-
-        return (
-            f"**Title**: {title}\n"
-            f"**Authors**: {authors}\n"
-            f"**Published**: {date}\n"
-            f"**URL**: {url}\n"
-            f"**PDF**: {pdf_url}\n\n"
-            f"🧾 **Summary (focused on):** _{focus}_\n\n{summary}"
-        )
+                summary = summarize_article_with_focus(paper.text, focus=focus, tool="Arxiv")
+
+        return [Evidence(
+            source="arXiv",
+            title=title,
+            url=url,
+            date=date,
+            summary=summary,
+            abstract=abstract,
+            raw_length=raw_length,
+        )]
 
     except Exception as e:
-        return f"❌ ArXiv error for '{query}': {e}"
+        return error_evidence("Arxiv", f"❌ ArXiv error for '{query}': {e}")
 
 
 # === Example Usage ===
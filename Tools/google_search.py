@@ -1,65 +1,146 @@
 import os
 import requests
+import copy
+from typing import List, Optional
 from dotenv import load_dotenv
-from utils import get_article, summarize_article_with_focus  
+from evidence import Evidence, error_evidence, source_from_url
+from resilience import call_timeout, concurrent_map, guarded_call
+from utils import get_article, summarize_article_with_focus, extract_passages
 
 # Load environment variables from .env (e.g., SERPER_API_KEY)
 load_dotenv()
 
 
-# === Google Search Tool ===
-def google_search(query: str) -> str:
+SERPER_URL = "https://google.serper.dev/search"
+SERPER_TIMEOUT = float(os.getenv("SERPER_TIMEOUT_SECONDS", "10"))
+SERPER_BATCH_SIZE = int(os.getenv("SERPER_BATCH_SIZE", "100"))      # queries per Serper batch request
+GOOGLE_FETCH_WORKERS = int(os.getenv("GOOGLE_FETCH_WORKERS", "8"))  # concurrent article fetches
+RESULTS_PER_QUERY = 2
+
+
+def _serper_post(payload, api_key: str) -> dict:
     """
-    Performs a Google search using Serper.dev API and returns summarized results.
-    
-    For each top 2 results:
-    - Fetches the full article
-    - Performs focused summarization relevant to the query
-    - Returns the title, snippet, summary, and link
+    Sends one request to Serper within the current request budget.
+    A list payload is a batch request and returns one result object per query.
+    """
+    response = requests.post(
+        SERPER_URL, json=payload, headers={"X-API-KEY": api_key},
+        timeout=call_timeout(SERPER_TIMEOUT),
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _summarize_result(record: Evidence, query: str, fast: bool) -> Evidence:
+    """
+    Fetches a result's article and replaces the record's summary with a focused one.
+    If the article cannot be fetched in time (or its site's breaker is open), the
+    record keeps the Serper snippet as its evidence.
+    """
+    full_article = get_article(record.url)
+
+    if full_article and not full_article.startswith("❌"):
+        if fast:
+            record.summary = extract_passages(full_article, focus=query)
+        else:
+            record.summary = summarize_article_with_focus(full_article, focus=query, tool="Google")
+        record.raw_length = len(full_article)
+    return record
+
+
+def _summarize_all(pending: list, fast: bool) -> None:
+    """
+    Fetches and summarizes the articles of (query, record) pairs concurrently.
+    """
+    concurrent_map(lambda item: _summarize_result(item[1], item[0], fast), pending, max_workers=GOOGLE_FETCH_WORKERS)
+
+
+# === Batched Google Search ===
+def google_search_batch(queries: List[str], fast: bool = False, snippet_only: bool = False) -> List[List[Evidence]]:
+    """
+    Searches many queries with as few Serper requests as possible (SERPER_BATCH_SIZE
+    queries per batch request), then fetches and summarizes all top results concurrently.
+
+    Args:
+        queries (List[str]): Search queries (claims).
+        fast (bool): Extract claim-ranked passages instead of LLM summaries.
+        snippet_only (bool): Skip article fetching entirely and use the Serper snippets.
+
+    Returns:
+        List[List[Evidence]]: Evidence records per query, in query order.
     """
     api_key = os.getenv("SERPER_API_KEY")
     if not api_key:
-        return "❌ SERPER_API_KEY not found in environment."
-
-    url = "https://google.serper.dev/search"
-    headers = {"X-API-KEY": api_key}
-    payload = {"q": query}
+        return [error_evidence("Google", "❌ SERPER_API_KEY not found in environment.") for _ in queries]
 
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    results: List[List[Evidence]] = []
+    pending = []  # (query, record) pairs whose article still has to be fetched
 
-        # Get top 2 organic search results
-        results = data.get("organic", [])[:2]
-        if not results:
-            return "No results found."
+    for start in range(0, len(queries), SERPER_BATCH_SIZE):
+        chunk = queries[start:start + SERPER_BATCH_SIZE]
+        try:
+            # A single query is sent as a plain search request
+            payload = [{"q": query} for query in chunk] if len(chunk) > 1 else {"q": chunk[0]}
+            data = guarded_call("serper", _serper_post, payload, api_key)
+            responses = data if isinstance(data, list) else [data]
+            # One response per query, or every later result would land on the wrong claim
+            if len(responses) != len(chunk) or not all(isinstance(r, dict) for r in responses):
+                raise ValueError(f"expected {len(chunk)} Serper responses, got {len(responses)}")
+        except Exception as e:
+            results.extend(error_evidence("Google", f"❌ Error fetching Google results: {e}") for _ in chunk)
+            continue
 
-        output = ""
+        for query, response in zip(chunk, responses):
+            records = []
+            # Get top 2 organic search results
+            for result in response.get("organic", [])[:RESULTS_PER_QUERY]:
+                link = result.get("link", "")
+                snippet = result.get("snippet", "")
+                record = Evidence(
+                    source=source_from_url(link, default="Google"),
+                    title=result.get("title", "No title"),
+                    url=link,
+                    date=result.get("date", ""),
+                    summary=snippet if snippet_only else "🔍 Could not extract article.",
+                    abstract=snippet,
+                )
+                records.append(record)
+                if link and not snippet_only:
+                    pending.append((query, record))
+            results.append(records)
 
-        # Process each search result
-        for i, result in enumerate(results, start=1):
-            title = result.get("title", "No title")
-            snippet = result.get("snippet", "No snippet")
-            link = result.get("link", "")
-            summary = ""
+    # Fan out article fetches and summaries across all queries at once
+    _summarize_all(pending, fast)
+    return results
 
-            # Try extracting and summarizing full article
-            if link:
-                full_article = get_article(link)
 
-                if full_article and not full_article.startswith("❌"):
-                    summary = summarize_article_with_focus(full_article, focus=query)
-                    summary = f"🔎 **Focused Summary:**\n{summary}\n"
-                else:
-                    summary = "🔍 Could not extract article."
+# === Google Search Tool ===
+def google_search(query: str, fast: bool = False, snippet_only: bool = False,
+                  serper_results: Optional[List[Evidence]] = None) -> List[Evidence]:
+    """
+    Performs a Google search using Serper.dev API and returns summarized results.
+    
+    For each top 2 results (fetched concurrently):
+    - Fetches the full article
+    - Performs focused summarization relevant to the query
+      (or, with fast=True, extracts claim-ranked passages without an LLM call)
+    - Returns an Evidence record with title, snippet, summary, and link
 
-            output += f"**{i}. {title}**\n{snippet}\n{summary}\n[{link}]({link})\n\n"
+    If an article cannot be fetched in time (or its site's breaker is open),
+    the record keeps the Serper snippet as its evidence. With snippet_only=True
+    no articles are fetched.
 
-        return output.strip()
+    serper_results are raw results for this query from an earlier batched search
+    (google_search_batch with snippet_only=True); only their articles are fetched.
+    If that search failed, the query is searched again.
+    """
+    if serper_results is None or any(record.is_error for record in serper_results):
+        return google_search_batch([query], fast=fast, snippet_only=snippet_only)[0]
 
-    except Exception as e:
-        return f"❌ Error fetching Google results: {e}"
+    records = [copy.copy(record) for record in serper_results]  # the batch keeps its snippets
+    if not snippet_only:
+        _summarize_all([(query, record) for record in records if record.url], fast)
+    return records
 
 
 # === Example Usage ===
@@ -0,0 +1,275 @@
+# pubmed_local.py
+
+import os
+import gzip
+import time
+import sqlite3
+import argparse
+import xml.etree.ElementTree as ET
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from utils import tokenize
+
+# === Local PubMed Index ===
+# MEDLINE baseline/update files (pubmed25n0001.xml.gz, ...) are stream-parsed into a
+# SQLite FTS5 index of titles, abstracts, journals, years and DOIs. Later update files
+# upsert revised citations and apply <DeleteCitation> lists, so the index is kept
+# current by ingesting each new update file once.
+load_dotenv()
+LOCAL_DB_PATH = os.getenv("PUBMED_LOCAL_DB", os.path.join(".cache", "pubmed.sqlite3"))
+INGEST_BATCH_SIZE = 5000
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS articles (
+        pmid     INTEGER PRIMARY KEY,
+        title    TEXT NOT NULL,
+        abstract TEXT NOT NULL,
+        journal  TEXT NOT NULL,
+        year     TEXT NOT NULL,
+        doi      TEXT NOT NULL
+    )
+    """,
+    # External-content FTS table kept in sync by the triggers below
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, abstract, journal, content='articles', content_rowid='pmid', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, abstract, journal) VALUES (new.pmid, new.title, new.abstract, new.journal);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, abstract, journal)
+        VALUES ('delete', old.pmid, old.title, old.abstract, old.journal);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, abstract, journal)
+        VALUES ('delete', old.pmid, old.title, old.abstract, old.journal);
+        INSERT INTO articles_fts(rowid, title, abstract, journal) VALUES (new.pmid, new.title, new.abstract, new.journal);
+    END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ingested_files (
+        name        TEXT PRIMARY KEY,   -- file name, e.g. pubmed25n1275.xml.gz
+        upserted    INTEGER NOT NULL,
+        deleted     INTEGER NOT NULL,
+        ingested_at REAL NOT NULL
+    )
+    """,
+]
+
+# bm25 column weights: title, abstract, journal
+_BM25_WEIGHTS = (5.0, 1.0, 0.5)
+
+
+@dataclass(slots=True)
+class LocalArticle:
+    pmid: int
+    title: str
+    abstract: str
+    journal: str
+    year: str
+    doi: str
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+# === Streaming MEDLINE Parser ===
+def _text(elem: Optional[ET.Element]) -> str:
+    return " ".join("".join(elem.itertext()).split()) if elem is not None else ""
+
+
+def _parse_article(elem: ET.Element) -> Optional[LocalArticle]:
+    citation = elem.find("MedlineCitation")
+    if citation is None or citation.find("PMID") is None:
+        return None
+    article = citation.find("Article")
+    if article is None:
+        return None
+
+    # Structured abstracts come as several labelled parts
+    parts = []
+    for part in article.findall("Abstract/AbstractText"):
+        label = part.get("Label")
+        parts.append(f"{label}: {_text(part)}" if label else _text(part))
+
+    year = (article.findtext("ArticleDate/Year")
+            or article.findtext("Journal/JournalIssue/PubDate/Year")
+            or (article.findtext("Journal/JournalIssue/PubDate/MedlineDate") or "")[:4]
+            or "n.d.")
+
+    doi = ""
+    for article_id in elem.findall("PubmedData/ArticleIdList/ArticleId"):
+        if article_id.get("IdType") == "doi":
+            doi = (article_id.text or "").strip()
+            break
+    if not doi:
+        for location in article.findall("ELocationID"):
+            if location.get("EIdType") == "doi":
+                doi = (location.text or "").strip()
+                break
+
+    return LocalArticle(
+        pmid=int(citation.findtext("PMID")),
+        title=_text(article.find("ArticleTitle")) or "No title",
+        abstract=" ".join(parts),
+        journal=citation.findtext("MedlineJournalInfo/MedlineTA") or _text(article.find("Journal/Title")) or "Unknown journal",
+        year=year,
+        doi=doi,
+    )
+
+
+def iter_medline(path: str) -> Iterator[Tuple[str, object]]:
+    """
+    Streams a MEDLINE XML file (plain or .gz) without loading it into memory.
+
+    Yields:
+        ("upsert", LocalArticle) for each <PubmedArticle>, and
+        ("delete", [pmid, ...]) for each <DeleteCitation> block.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        context = ET.iterparse(f, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag == "PubmedArticle":
+                record = _parse_article(elem)
+                if record is not None:
+                    yield "upsert", record
+                root.clear()  # drop parsed articles so memory stays flat
+            elif elem.tag == "DeleteCitation":
+                yield "delete", [int(p.text) for p in elem.findall("PMID") if (p.text or "").strip()]
+                root.clear()
+
+
+# === Ingestion ===
+def _flush(conn: sqlite3.Connection, batch: List[LocalArticle]) -> None:
+    conn.executemany(
+        "INSERT INTO articles (pmid, title, abstract, journal, year, doi) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(pmid) DO UPDATE SET title = excluded.title, abstract = excluded.abstract, "
+        "journal = excluded.journal, year = excluded.year, doi = excluded.doi",
+        [(a.pmid, a.title, a.abstract, a.journal, a.year, a.doi) for a in batch],
+    )
+    batch.clear()
+
+
+def ingest_file(path: str, db_path: str = LOCAL_DB_PATH, force: bool = False) -> Optional[Dict[str, int]]:
+    """
+    Ingests one baseline or update file in a single transaction. Files already ingested
+    (by name) are skipped unless force=True, so re-running over a directory only picks
+    up new update files.
+
+    Returns:
+        Optional[Dict[str, int]]: Upserted/deleted counts, or None if the file was skipped.
+    """
+    name = os.path.basename(path)
+    with closing(_connect(db_path)) as conn, conn:
+        if not force and conn.execute("SELECT 1 FROM ingested_files WHERE name = ?", (name,)).fetchone():
+            return None
+
+        upserted = deleted = 0
+        batch: List[LocalArticle] = []
+        for action, item in iter_medline(path):
+            if action == "upsert":
+                batch.append(item)
+                upserted += 1
+                if len(batch) >= INGEST_BATCH_SIZE:
+                    _flush(conn, batch)
+            else:
+                _flush(conn, batch)  # deletions must follow earlier upserts in the file
+                conn.executemany("DELETE FROM articles WHERE pmid = ?", [(pmid,) for pmid in item])
+                deleted += len(item)
+        _flush(conn, batch)
+
+        conn.execute("INSERT OR REPLACE INTO ingested_files VALUES (?, ?, ?, ?)", (name, upserted, deleted, time.time()))
+    return {"upserted": upserted, "deleted": deleted}
+
+
+def ingest_files(paths: List[str], db_path: str = LOCAL_DB_PATH, force: bool = False) -> Dict[str, int]:
+    """
+    Ingests files in name order (baseline before updates, updates in sequence).
+    """
+    totals = {"files": 0, "skipped": 0, "upserted": 0, "deleted": 0}
+    for path in sorted(paths, key=os.path.basename):
+        counts = ingest_file(path, db_path, force)
+        if counts is None:
+            totals["skipped"] += 1
+            continue
+        totals["files"] += 1
+        totals["upserted"] += counts["upserted"]
+        totals["deleted"] += counts["deleted"]
+    return totals
+
+
+# === Search ===
+def _fts_query(query: str) -> str:
+    # OR over the query's content words (quoted, so FTS5 syntax in claims is inert); bm25 ranks
+    return " OR ".join(f'"{term}"' for term in dict.fromkeys(tokenize(query)))
+
+
+def search_local(query: str, max_results: int = 2, db_path: str = LOCAL_DB_PATH) -> List[LocalArticle]:
+    """
+    Returns the best-matching articles by bm25 relevance (titles weighted highest).
+
+    Raises:
+        FileNotFoundError: If the local index has not been built.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"local PubMed index not found at {db_path}")
+
+    match = _fts_query(query)
+    if not match:
+        return []
+
+    with closing(_connect(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT a.pmid, a.title, a.abstract, a.journal, a.year, a.doi FROM articles_fts "
+            "JOIN articles a ON a.pmid = articles_fts.rowid "
+            f"WHERE articles_fts MATCH ? ORDER BY bm25(articles_fts, {', '.join(map(str, _BM25_WEIGHTS))}) LIMIT ?",
+            (match, max_results),
+        ).fetchall()
+    return [LocalArticle(*row) for row in rows]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query the local PubMed (MEDLINE) index.")
+    parser.add_argument("--db", default=LOCAL_DB_PATH, help="Index path (default: PUBMED_LOCAL_DB).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Ingest baseline/update XML files (.xml or .xml.gz).")
+    ingest_parser.add_argument("files", nargs="+")
+    ingest_parser.add_argument("--force", action="store_true", help="Re-ingest files already recorded.")
+
+    search_parser = commands.add_parser("search", help="Query the index.")
+    search_parser.add_argument("query")
+    search_parser.add_argument("-n", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        start = time.perf_counter()
+        totals = ingest_files(args.files, args.db, args.force)
+        print(f"📥 {totals} in {time.perf_counter() - start:.1f}s")
+    else:
+        start = time.perf_counter()
+        results = search_local(args.query, args.n, args.db)
+        print(f"🔎 {len(results)} results in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for article in results:
+            print(f"- [{article.pmid}] {article.title} | {article.journal} ({article.year}) | doi:{article.doi or '-'}")
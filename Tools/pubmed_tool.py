@@ -1,14 +1,33 @@
 import os
+import sqlite3
 import requests  
+from typing import List, Tuple
 from dotenv import load_dotenv
 from Bio import Entrez
-from utils import get_article, summarize_article_with_focus  
+from evidence import Evidence, error_evidence
+from resilience import concurrent_map, guarded_call
+from utils import get_article, summarize_article_with_focus, extract_passages, relevance_score
+from Tools.pubmed_local import search_local
 
 # === Load environment variables and configure Entrez ===
 # Required for PubMed API usage (email is mandatory per NCBI policy)
 load_dotenv()
 EMAIL = os.getenv("NCBI_EMAIL") 
 Entrez.email = EMAIL
+NCBI_TIMEOUT = float(os.getenv("NCBI_TIMEOUT_SECONDS", "15"))
+
+# === Abstract Triage Thresholds ===
+# Abstracts scoring at or above SUFFICIENT answer the claim on their own; below
+# MIN_RELEVANCE the article is off-topic. Only the records in between (or without
+# an abstract) have their full text fetched from the publisher, concurrently.
+ABSTRACT_SUFFICIENT = float(os.getenv("PUBMED_ABSTRACT_SUFFICIENT", "0.6"))
+ABSTRACT_MIN_RELEVANCE = float(os.getenv("PUBMED_ABSTRACT_MIN_RELEVANCE", "0.2"))
+FULLTEXT_WORKERS = int(os.getenv("PUBMED_FULLTEXT_WORKERS", "4"))
+
+# === Backend ===
+# "live": NCBI E-utilities (default); "local": MEDLINE FTS5 index built with pubmed_local.py
+PUBMED_BACKEND = os.getenv("PUBMED_BACKEND", "live").lower()
+LOCAL_FULLTEXT = os.getenv("PUBMED_LOCAL_FULLTEXT", "0") == "1"  # local results stay offline by default
 
 
 # === Utility: Convert PubMed ID to its webpage URL ===
@@ -19,85 +38,173 @@ def _pmid_to_url(pmid: str) -> str:
     return f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/"
 
 
+# === E-utilities Calls (guarded: Bio.Entrez has no timeout of its own) ===
+def _entrez_search(query: str, max_results: int) -> dict:
+    handle = Entrez.esearch(db="pubmed", term=query, retmax=max_results, sort="relevance")
+    try:
+        return Entrez.read(handle)
+    finally:
+        handle.close()
+
+
+def _entrez_fetch(id_list: list) -> dict:
+    handle = Entrez.efetch(db="pubmed", id=",".join(id_list), retmode="xml")
+    try:
+        return Entrez.read(handle)
+    finally:
+        handle.close()
+
+
+# === Full-Text Summary for Triaged Records ===
+def _summarize_full_text(record: Evidence, focus: str, fast: bool) -> Evidence:
+    """
+    Fetches a record's full text and replaces its summary with a focused one.
+    A slow, paywalled or failing publisher site falls back to the abstract.
+    """
+    full_text = get_article(record.url)
+
+    if full_text and len(full_text) > 1000 and not full_text.startswith("❌"):
+        # Focused summarization from full-text (abstract kept on the record)
+        if fast:
+            record.summary = extract_passages(full_text, focus).strip()
+        else:
+            record.summary = summarize_article_with_focus(full_text[:75000], focus, tool="PubMed").strip()
+        record.raw_length = len(full_text)
+    elif record.abstract:
+        record.summary = f"(Fallback to abstract)\n\n{record.abstract}"
+    else:
+        record.summary = "No summary available."
+    return record
+
+
+# === Article Sources (live E-utilities or local MEDLINE index) ===
+def _live_articles(query: str, max_results: int) -> List[Tuple[Evidence, bool]]:
+    """
+    Searches PubMed via E-utilities (esearch + efetch).
+
+    Returns:
+        List[Tuple[Evidence, bool]]: Records with the abstract as summary, and whether
+        each has a DOI full-text link worth fetching.
+    """
+    # Step 1: Perform search
+    record = guarded_call("ncbi", _entrez_search, query, max_results, timeout=NCBI_TIMEOUT)
+
+    id_list = record.get("IdList", [])
+    if not id_list:
+        return []
+
+    # Step 2: Fetch metadata for matched articles
+    records = guarded_call("ncbi", _entrez_fetch, id_list, timeout=NCBI_TIMEOUT)
+
+    articles = []
+
+    # Step 3: Process each article
+    for article in records.get("PubmedArticle", []):
+        citation = article["MedlineCitation"]
+        article_data = citation.get("Article", {})
+
+        # Extract core metadata (structured abstracts come as several labelled parts)
+        pmid = citation.get("PMID", "?")
+        title = article_data.get("ArticleTitle", "No title")
+        abstract = " ".join(str(part) for part in article_data.get("Abstract", {}).get("AbstractText", []))
+        journal = citation.get("MedlineJournalInfo", {}).get("MedlineTA", "Unknown journal")
+        year = citation.get("ArticleDate", [{}])[0].get("Year", "n.d.")
+        url = _pmid_to_url(str(pmid))
+
+        # Step 4: Try to find DOI to build full-text URL
+        full_url = None
+        ids = article.get("PubmedData", {}).get("ArticleIdList", [])
+        for item in ids:
+            if item.attributes.get("IdType") == "doi":
+                full_url = f"https://doi.org/{item}"
+                break
+
+        articles.append((Evidence(
+            source=str(journal),
+            title=str(title),
+            url=full_url or url,
+            date=str(year),
+            summary=abstract or "No summary available.",
+            abstract=abstract,
+        ), full_url is not None))
+
+    return articles
+
+
+def _local_articles(query: str, max_results: int) -> List[Tuple[Evidence, bool]]:
+    """
+    Searches the local MEDLINE FTS5 index (see pubmed_local.py); no network round trips.
+    Full text is only fetched if PUBMED_LOCAL_FULLTEXT=1.
+    """
+    return [
+        (Evidence(
+            source=article.journal,
+            title=article.title,
+            url=f"https://doi.org/{article.doi}" if article.doi else _pmid_to_url(str(article.pmid)),
+            date=article.year,
+            summary=article.abstract or "No summary available.",
+            abstract=article.abstract,
+        ), LOCAL_FULLTEXT and bool(article.doi))
+        for article in search_local(query, max_results)
+    ]
+
+
 # === Main PubMed Search Tool ===
-def pubmed_search(query: str, focus: str = "", max_results: int = 2) -> str:
+def pubmed_search(query: str, focus: str = "", max_results: int = 2, fast: bool = False) -> List[Evidence]:
     """
     Searches PubMed for the given query, fetches top results, and summarizes them.
+
+    With PUBMED_BACKEND=local, articles come from the local MEDLINE index instead of
+    E-utilities (falling back to E-utilities if the index is unavailable).
+
+    Each abstract is first scored against the claim. Full text is fetched (concurrently)
+    only for records whose abstract is relevant but not sufficient on its own, or that
+    have no abstract; all other records use their abstract directly.
     
     Parameters:
         query (str): The search term (e.g., "mRNA vaccine fertility")
         focus (str): The user's original claim, used to focus summarization
         max_results (int): Number of PubMed articles to fetch (default: 2)
+        fast (bool): Use claim-ranked passages from the full text instead of LLM summaries
     
     Returns:
-        str: Markdown-formatted summary of search results (title, journal, date, summary, links)
+        List[Evidence]: One record per article (title, journal, year, summary, abstract, link)
     """
     try:
-        # Step 1: Perform search
-        handle = Entrez.esearch(db="pubmed", term=query, retmax=max_results, sort="relevance")
-        record = Entrez.read(handle)
-        handle.close()
-
-        id_list = record.get("IdList", [])
-        if not id_list:
-            return "No PubMed results."
-
-        # Step 2: Fetch metadata for matched articles
-        handle = Entrez.efetch(db="pubmed", id=",".join(id_list), retmode="xml")
-        records = Entrez.read(handle)
-        handle.close()
-
-        lines = []
-
-        # Step 3: Process each article
-        for article in records.get("PubmedArticle", []):
-            citation = article["MedlineCitation"]
-            article_data = citation.get("Article", {})
-
-            # Extract core metadata
-            pmid = citation.get("PMID", "?")
-            title = article_data.get("ArticleTitle", "No title")
-            abstract = article_data.get("Abstract", {}).get("AbstractText", [""])[0]
-            journal = citation.get("MedlineJournalInfo", {}).get("MedlineTA", "Unknown journal")
-            year = citation.get("ArticleDate", [{}])[0].get("Year", "n.d.")
-            url = _pmid_to_url(str(pmid))
-
-            # Step 4: Try to find DOI to build full-text URL
-            full_url = None
-            ids = article.get("PubmedData", {}).get("ArticleIdList", [])
-            for item in ids:
-                if item.attributes.get("IdType") == "doi":
-                    full_url = f"https://doi.org/{item}"
-                    break
-
-            # Step 5: Try extracting & summarizing full-text if available
-            summary = ""
-            if full_url:
-                full_text = get_article(full_url)
-
-                if full_text and len(full_text) > 1000 and focus:
-                    # Focused summarization from full-text + abstract backup
-                    summary = summarize_article_with_focus(full_text[:75000], focus)
-                    summary += f"\n\n📌 Abstract (for reference):\n{abstract}"
-                elif abstract:
-                    summary = f"(Fallback to abstract)\n\n{abstract}"
-                else:
-                    summary = "No summary available."
-            else:
-                # Use abstract if full-text link not available
-                summary = abstract or "No summary available."
-
-            # Step 6: Format the result
-            lines.append(
-                f"**{title}** — _{journal} ({year})_\n"
-                f"🔗 [PubMed]({url}) {' | [Full Text](' + full_url + ')' if full_url else ''}\n\n"
-                f"🔎 **Focused Summary:**\n{summary.strip()}\n"
-            )
-
-        return "\n\n".join(lines)
+        articles = None
+        if PUBMED_BACKEND == "local":
+            try:
+                articles = _local_articles(query, max_results)
+            except (FileNotFoundError, sqlite3.Error):
+                articles = None  # index not built or unreadable; use E-utilities
+
+        if articles is None:
+            articles = _live_articles(query, max_results)
+
+        records_out = []
+        needs_full_text = []
+
+        for evidence, has_full_text in articles:
+            records_out.append(evidence)
+
+            # Step 5: Triage — does the abstract settle the claim, or is the full text needed?
+            if not has_full_text or not focus:
+                continue
+            if evidence.abstract:
+                score = relevance_score(f"{evidence.title}\n{evidence.abstract}", focus)
+                if score >= ABSTRACT_SUFFICIENT or score < ABSTRACT_MIN_RELEVANCE:
+                    evidence.summary = f"(Abstract only, relevance {score:.2f})\n\n{evidence.abstract}"
+                    continue
+            needs_full_text.append(evidence)
+
+        # Step 6: Fetch and summarize the remaining full texts concurrently
+        concurrent_map(lambda evidence: _summarize_full_text(evidence, focus, fast),
+                       needs_full_text, max_workers=FULLTEXT_WORKERS)
+
+        return records_out
 
     except Exception as e:
-        return f"❌ PubMed error: {e}"
+        return error_evidence("PubMed", f"❌ PubMed error: {e}")
 
 
 # === Module-level test block ===
@@ -1,15 +1,19 @@
 # === Imports and Environment Setup ===
 import os
+from typing import List
 from dotenv import load_dotenv
 from langchain_tavily import TavilySearch
+from evidence import Evidence, error_evidence, source_from_url
+from resilience import guarded_call
 
 # Load API key from .env file
 load_dotenv()
 API_KEY = os.getenv("TAVILY_API_KEY")
+TAVILY_TIMEOUT = float(os.getenv("TAVILY_TIMEOUT_SECONDS", "20"))
 
 
 # === Main Tavily Search Tool ===
-def tavily_search(query: str, max_results: int = 4) -> str:
+def tavily_search(query: str, max_results: int = 4) -> List[Evidence]:
     """
     Performs a Tavily search using the provided query string.
     
@@ -18,10 +22,10 @@ def tavily_search(query: str, max_results: int = 4) -> str:
         max_results (int): Number of search results to return (default = 4)
 
     Returns:
-        str: Formatted markdown-like summary of Tavily results, or error message.
+        List[Evidence]: One record per Tavily result, or a single error record.
     """
     if not API_KEY:
-        return "❌ TAVILY_API_KEY missing in .env"
+        return error_evidence("Tavily", "❌ TAVILY_API_KEY missing in .env")
 
     # Initialize the TavilySearch tool (LangChain wrapper for Tavily API)
     tool = TavilySearch(
@@ -34,28 +38,35 @@ def tavily_search(query: str, max_results: int = 4) -> str:
 
     try:
         # Perform search via LangChain interface
-        results = tool.invoke({"query": query})
+        results = guarded_call("tavily", tool.invoke, {"query": query}, timeout=TAVILY_TIMEOUT)
 
         # If result is wrapped inside a dictionary, extract the actual list
         if isinstance(results, dict) and "results" in results:
             results = results["results"]
 
         if not results:
-            return "No Tavily results."
+            return []
 
-        # Format the search results into readable numbered list
-        lines = []
-        for i, r in enumerate(results, 1):
+        # Convert the search results into evidence records
+        records = []
+        for r in results:
             title = (r.get("title") or "No title").strip()
             content = (r.get("content") or "").strip()
             url = r.get("url") or ""  
 
-            lines.append(f"**{i}. {title}**\n{content}\n[{url}]({url})\n")
+            records.append(Evidence(
+                source=source_from_url(url, default="Tavily"),
+                title=title,
+                url=url,
+                date=r.get("published_date") or "",
+                summary=content,
+                raw_length=len(r.get("raw_content") or content),
+            ))
 
-        return "\n".join(lines)
+        return records
 
     except Exception as e:
-        return f"❌ Tavily search failed: {e}"
+        return error_evidence("Tavily", f"❌ Tavily search failed: {e}")
 
 
 # === Module-level test block ===
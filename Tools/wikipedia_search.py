@@ -1,9 +1,18 @@
 # wikipedia_search.py
 
+import os
 import wikipedia
-from utils import summarize_article_with_focus  # Handles focused summarization
+from typing import List
+from evidence import Evidence, error_evidence
+from resilience import guarded_call
+from utils import summarize_article_with_focus, extract_passages  # Handles focused summarization
 
-def wikipedia_summary(query: str, fallback_sentences: int = 16, max_chars: int = 75000) -> str:
+WIKIPEDIA_TIMEOUT = float(os.getenv("WIKIPEDIA_TIMEOUT_SECONDS", "15"))
+# Lookup misses are answers, not provider failures, so they do not trip the breaker
+_BENIGN = (wikipedia.exceptions.DisambiguationError, wikipedia.exceptions.PageError)
+
+def wikipedia_summary(query: str, fallback_sentences: int = 16, max_chars: int = 75000,
+                      fast: bool = False) -> List[Evidence]:
     """
     Search Wikipedia and return a focused summary of the top result.
 
@@ -14,38 +23,47 @@ def wikipedia_summary(query: str, fallback_sentences: int = 16, max_chars: int =
         query (str): The search term or user claim to analyze.
         fallback_sentences (int): Number of sentences in fallback mode.
         max_chars (int): Max characters to consider from full article for LLM summarization.
+        fast (bool): Return claim-ranked passages from the page instead of an LLM summary.
 
     Returns:
-        str: Formatted Markdown summary with source and focus-based summary.
+        List[Evidence]: Single-item list with the page and its focus-based summary.
     """
     try:
-        search_results = wikipedia.search(query)
+        search_results = guarded_call("wikipedia", wikipedia.search, query, timeout=WIKIPEDIA_TIMEOUT)
         if not search_results:
-            return f"❌ No Wikipedia results for: {query}" 
+            return error_evidence("Wikipedia", f"❌ No Wikipedia results for: {query}")
 
         # Use the first search result
         page_title = search_results[0]
-        page = wikipedia.page(page_title, auto_suggest=False)
+        page = guarded_call("wikipedia", wikipedia.page, page_title, auto_suggest=False,
+                            timeout=WIKIPEDIA_TIMEOUT, benign=_BENIGN)
         full_content = page.content.strip()
         url = page.url
 
+        # Fast mode: rank passages locally (any article length, no LLM call)
+        if fast and query:
+            summary = extract_passages(full_content, focus=query, max_chars=max_chars)
         # Use full article if it's within length limits
-        if len(full_content) < max_chars and query:
-            focused = summarize_article_with_focus(full_content[:max_chars], focus=query)
-            summary = f"{focused}\n\n📌 Article excerpt from Wikipedia"
+        elif len(full_content) < max_chars and query:
+            summary = summarize_article_with_focus(full_content[:max_chars], focus=query, tool="Wikipedia")
         else:
             # Fallback to a generic summary if the article is too long
-            brief = wikipedia.summary(page_title, sentences=fallback_sentences)
+            brief = guarded_call(
+                "wikipedia", wikipedia.summary, page_title, sentences=fallback_sentences,
+                timeout=WIKIPEDIA_TIMEOUT, benign=_BENIGN
+            )
             summary = f"(Fallback summary: {fallback_sentences} sentences)\n\n{brief}"
 
-        return (
-            f"**{page.title}** — _Wikipedia_\n"
-            f"🔗 [Full Article]({url})\n\n"
-            f"🔎 **Focused Summary:**\n{summary.strip()}\n"
-        )
+        return [Evidence(
+            source="Wikipedia",
+            title=page.title,
+            url=url,
+            summary=summary.strip(),
+            raw_length=len(full_content),
+        )]
 
     except Exception as e:
-        return f"❌ Wikipedia error for '{query}': {e}"
+        return error_evidence("Wikipedia", f"❌ Wikipedia error for '{query}': {e}")
 
 
 # Example usage (for module-level testing)
@@ -0,0 +1,119 @@
+# app_jobs.py
+
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from LangGraph import graph
+from document_mode import DocumentReport, verify_document
+
+# === Background Verification Jobs (Streamlit app) ===
+# Claims submitted in the app run on a shared, bounded executor instead of the script
+# thread, so reruns and other sessions stay responsive. A job records its progress
+# (graph nodes, document-mode stages); the app polls it and keeps finished results.
+load_dotenv()
+APP_MAX_CONCURRENT_JOBS = int(os.getenv("APP_MAX_CONCURRENT_JOBS", "8"))
+APP_HISTORY_SIZE = int(os.getenv("APP_HISTORY_SIZE", "10"))
+
+# Progress labels per graph node
+STEP_LABELS = {
+    "DecideTools": "🧭 Selected tools",
+    "RunTools": "🔧 Gathered evidence",
+    "EvaluateClaim": "⚖️ Reached a verdict",
+}
+
+
+@dataclass
+class VerificationJob:
+    """
+    One claim being verified in the background. Only the worker thread writes to it;
+    the app reads progress and, once done, the final state.
+    """
+    claim: str
+    mode: str
+    submitted_at: float = field(default_factory=time.time)
+    started: bool = False
+    steps: List[str] = field(default_factory=list)  # completed graph nodes, in order
+    state: Dict = field(default_factory=dict)
+    future: Optional[Future] = None
+
+    @property
+    def key(self) -> tuple:
+        return result_key(self.claim, self.mode)
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+def result_key(claim: str, mode: str) -> tuple:
+    return (" ".join(claim.lower().split()), mode)
+
+
+def _run(job: VerificationJob) -> Dict:
+    job.started = True
+    job.state = {"user_input": job.claim, "mode": job.mode}
+    # Stream node updates so the app can show progress while the graph runs
+    for update in graph.stream(dict(job.state), stream_mode="updates"):
+        for node, values in update.items():
+            job.state.update(values or {})
+            job.steps.append(node)
+    return job.state
+
+
+def submit_job(executor: ThreadPoolExecutor, claim: str, mode: str) -> VerificationJob:
+    """
+    Starts verifying a claim on the shared executor and returns its job handle.
+    """
+    job = VerificationJob(claim=claim, mode=mode)
+    job.future = executor.submit(_run, job)
+    return job
+
+
+@dataclass
+class DocumentJob:
+    """
+    One document being verified in the background (see document_mode.verify_document).
+    """
+    source: str
+    mode: str
+    submitted_at: float = field(default_factory=time.time)
+    started: bool = False
+    steps: List[str] = field(default_factory=list)  # progress messages, in order
+    future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+def _run_document(job: DocumentJob) -> DocumentReport:
+    job.started = True
+    return verify_document(job.source, job.mode, on_progress=job.steps.append)
+
+
+def submit_document_job(executor: ThreadPoolExecutor, source: str, mode: str) -> DocumentJob:
+    """
+    Starts verifying a document on the shared executor and returns its job handle.
+    """
+    job = DocumentJob(source=source, mode=mode)
+    job.future = executor.submit(_run_document, job)
+    return job
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """
+    Returns the executor shared by every page and session of the app process.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=APP_MAX_CONCURRENT_JOBS, thread_name_prefix="verify")
+        return _executor
@@ -0,0 +1,155 @@
+# cpu_pool.py
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+
+# === CPU Pool Configuration (overridable via .env) ===
+# Trafilatura, PyMuPDF and tiktoken hold the GIL, so concurrent tools would serialise on
+# them. They run in a shared, warm process pool instead: bytes/text go in, text/counts
+# come out. CPU_POOL_SIZE=0 runs everything inline (e.g. for debugging).
+load_dotenv()
+CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", str(max((os.cpu_count() or 2) - 1, 1))))
+CPU_POOL_MIN_CHARS = int(os.getenv("CPU_POOL_MIN_CHARS", "20000"))  # smaller inputs are cheaper inline
+CPU_POOL_START_METHOD = os.getenv("CPU_POOL_START_METHOD", "spawn")  # fork is unsafe with threads
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_stats = {"submitted": 0, "in_flight": 0, "peak_queue": 0, "inline": 0}
+_stats_lock = threading.Lock()
+
+
+# === Worker Functions (top-level so they pickle by reference) ===
+def _warm_worker() -> None:
+    # Pay the import and tokenizer-loading cost once per worker, not per task
+    import fitz  # noqa: F401
+    import tiktoken
+    import trafilatura  # noqa: F401
+    try:
+        tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        pass  # best-effort: a failing initializer would break the whole pool
+
+
+def _noop() -> None:
+    return None
+
+
+def html_to_text(body: bytes) -> str:
+    import trafilatura
+    return (trafilatura.extract(body) or "").strip()
+
+
+def pdf_to_text(data: bytes) -> str:
+    import fitz  # PyMuPDF
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "\n".join(page.get_text() for page in doc).strip()
+
+
+def token_count(text: str, model: str = "gpt-4o") -> int:
+    import tiktoken
+    return len(tiktoken.encoding_for_model(model).encode(text or ""))
+
+
+# === Pool Management ===
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if CPU_POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=CPU_POOL_SIZE,
+                mp_context=multiprocessing.get_context(CPU_POOL_START_METHOD),
+                initializer=_warm_worker,
+            )
+            # Start every worker now so the first requests do not pay the spawn cost
+            for _ in range(CPU_POOL_SIZE):
+                _pool.submit(_noop)
+        return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _task_done(_future) -> None:
+    with _stats_lock:
+        _stats["in_flight"] -= 1
+
+
+def run_cpu(fn: Callable, *args, size: int = 0):
+    """
+    Runs a CPU-bound worker function in the shared process pool and waits for it.
+
+    Args:
+        fn (Callable): A top-level function of this module (must be picklable).
+        size (int): Input size in characters/bytes; inputs below CPU_POOL_MIN_CHARS
+            run inline since pickling would cost more than it saves.
+
+    Returns:
+        The function's result. Falls back to running inline if the pool is disabled
+        or a worker died (the pool is then recreated on the next call).
+    """
+    pool = _get_pool() if size >= CPU_POOL_MIN_CHARS else None
+    if pool is None:
+        with _stats_lock:
+            _stats["inline"] += 1
+        return fn(*args)
+
+    try:
+        future = pool.submit(fn, *args)
+    except (BrokenProcessPool, RuntimeError):
+        _reset_pool(pool)
+        return fn(*args)
+
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _stats["in_flight"] += 1
+        _stats["peak_queue"] = max(_stats["peak_queue"], _stats["in_flight"] - CPU_POOL_SIZE)
+    future.add_done_callback(_task_done)
+
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        return fn(*args)
+
+
+# === Reporting ===
+def queue_depth() -> int:
+    """
+    Tasks waiting for a free worker (in flight beyond the pool size).
+    """
+    with _stats_lock:
+        return max(_stats["in_flight"] - CPU_POOL_SIZE, 0)
+
+
+def pool_stats() -> Dict[str, int]:
+    """
+    Returns pool size, tasks in flight, current and peak queue depth, and how many
+    tasks were offloaded vs run inline.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        "workers": max(CPU_POOL_SIZE, 0),
+        "in_flight": stats["in_flight"],
+        "queue_depth": max(stats["in_flight"] - CPU_POOL_SIZE, 0),
+        "peak_queue": stats["peak_queue"],
+        "offloaded": stats["submitted"],
+        "inline": stats["inline"],
+    }
+
+
+def reset_pool_stats() -> None:
+    with _stats_lock:
+        _stats.update(submitted=0, peak_queue=0, inline=0)
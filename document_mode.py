@@ -0,0 +1,240 @@
+# document_mode.py
+
+import os
+import ast
+import argparse
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from langchain_core.messages import HumanMessage
+from dotenv import load_dotenv
+from evidence import Evidence
+from evidence_index import embed
+from llm_pool import invoke_llm
+from LangGraph import evaluate_claim_node, route_tools, run_selected_tools
+from resilience import concurrent_map
+from utils import get_article, relevance_score
+
+load_dotenv()
+
+# === Document Mode ===
+# Verifies every checkable claim in an article with far fewer tool runs than one graph
+# run per claim: claims are extracted with one LLM call, related claims are grouped,
+# tools are routed and run once per group, and each claim gets its own verdict over
+# its group's shared evidence.
+DOC_MAX_CHARS = int(os.getenv("DOC_MAX_CHARS", "30000"))           # document text sent for extraction
+DOC_MAX_CLAIMS = int(os.getenv("DOC_MAX_CLAIMS", "25"))
+DOC_GROUP_THRESHOLD = float(os.getenv("DOC_GROUP_THRESHOLD", "0.3"))  # claim similarity to join a group
+DOC_GROUP_MAX = int(os.getenv("DOC_GROUP_MAX", "5"))                  # claims sharing one evidence run
+DOC_WORKERS = int(os.getenv("DOC_WORKERS", "4"))                      # groups / verdicts run concurrently
+DOC_MIN_COVERAGE = float(os.getenv("DOC_MIN_COVERAGE", "0.6"))        # claim terms the shared evidence must contain
+
+
+@dataclass(slots=True)
+class ClaimGroup:
+    """
+    Related claims that share one routing decision and one set of tool outputs.
+    The representative (most central claim) is used as the search query; claims the
+    shared evidence does not cover get their own search (claim_outputs).
+    """
+    claims: List[str]
+    representative: str
+    selected_tools: List[str] = field(default_factory=list)
+    tool_outputs: Dict[str, List[Evidence]] = field(default_factory=dict)
+    claim_outputs: Dict[str, Dict[str, List[Evidence]]] = field(default_factory=dict)
+
+    def evidence_for(self, claim: str) -> Dict[str, List[Evidence]]:
+        """
+        The claim's own search results (if any) followed by the group's shared evidence.
+        """
+        own = self.claim_outputs.get(claim, {})
+        return {tool: own.get(tool, []) + self.tool_outputs.get(tool, [])
+                for tool in dict.fromkeys([*own, *self.tool_outputs])}
+
+
+@dataclass(slots=True)
+class ClaimVerdict:
+    claim: str
+    group: int  # index into DocumentReport.groups
+    verdict: str
+
+
+@dataclass(slots=True)
+class DocumentReport:
+    source: str
+    claims: List[ClaimVerdict]
+    groups: List[ClaimGroup]
+
+
+# === Document Loading ===
+def load_document(source: str) -> str:
+    """
+    Returns the text of a URL (via get_article) or the source itself if it is plain text.
+
+    Raises:
+        ValueError: If the URL's article text cannot be extracted.
+    """
+    source = source.strip()
+    if source.startswith(("http://", "https://")) and "\n" not in source:
+        text = get_article(source)
+        if text.startswith("❌"):
+            raise ValueError(text)
+        return text
+    return source
+
+
+# === Claim Extraction ===
+def extract_claims(text: str, max_claims: int = DOC_MAX_CLAIMS) -> List[str]:
+    """
+    Uses the "extract" model tier to list the document's checkable factual claims,
+    each rewritten to stand on its own (names instead of pronouns, explicit dates).
+    Returns [] if the response cannot be parsed.
+    """
+    system_prompt = f"""
+You extract checkable factual claims from a document for fact-checking.
+A checkable claim states a specific fact that external sources could confirm or refute.
+Skip opinions, predictions, questions and rhetorical statements.
+Rewrite each claim so it is understandable on its own (replace pronouns with names, keep numbers and dates).
+
+Return a Python list of strings with at most {max_claims} claims, most important first.
+Only return the list. Do not include explanation.
+"""
+
+    response = invoke_llm("extract", [
+        HumanMessage(content=system_prompt.strip()),
+        HumanMessage(content=text[:DOC_MAX_CHARS])
+    ])
+
+    try:
+        claims = ast.literal_eval(response.content.strip())
+        assert isinstance(claims, list)
+    except Exception:
+        return []
+
+    unique = dict.fromkeys(str(c).strip() for c in claims if str(c).strip())
+    return list(unique)[:max_claims]
+
+
+# === Claim Grouping ===
+def group_claims(claims: List[str], threshold: float = DOC_GROUP_THRESHOLD,
+                 max_size: int = DOC_GROUP_MAX) -> List[ClaimGroup]:
+    """
+    Greedily groups claims whose hashing embeddings (see evidence_index.embed) are
+    similar to a group's centroid, so claims about the same topic share evidence.
+    """
+    vectors = [embed(claim) for claim in claims]
+    members: List[List[int]] = []
+    centroids: List[np.ndarray] = []
+
+    for i, vector in enumerate(vectors):
+        best, best_score = None, threshold
+        for g, centroid in enumerate(centroids):
+            score = float(centroid @ vector) / (float(np.linalg.norm(centroid)) or 1.0)
+            if len(members[g]) < max_size and score >= best_score:
+                best, best_score = g, score
+        if best is None:
+            members.append([i])
+            centroids.append(vector.copy())
+        else:
+            members[best].append(i)
+            centroids[best] += vector
+
+    groups = []
+    for indices, centroid in zip(members, centroids):
+        representative = max(indices, key=lambda i: float(vectors[i] @ centroid))
+        groups.append(ClaimGroup(claims=[claims[i] for i in indices], representative=claims[representative]))
+    return groups
+
+
+# === Evidence per Group ===
+def _evidence_text(tool_outputs: Dict[str, List[Evidence]]) -> str:
+    return "\n".join(f"{record.title}\n{getattr(record, record.context_field)}"
+                     for records in tool_outputs.values() for record in records if not record.is_error)
+
+
+def gather_group_evidence(group: ClaimGroup, mode: str = "full") -> ClaimGroup:
+    """
+    Routes once for all claims in the group, then runs the selected tools once with
+    the representative claim as the query. Claims whose key terms the shared evidence
+    does not cover (below DOC_MIN_COVERAGE, see utils.relevance_score) are searched
+    with the same tools on their own.
+    """
+    state = run_selected_tools({
+        "user_input": group.representative,
+        "selected_tools": route_tools("\n".join(group.claims)),
+        "mode": mode,
+    })
+    group.selected_tools = state["selected_tools"]
+    group.tool_outputs = state["tool_outputs"]
+
+    shared_text = _evidence_text(group.tool_outputs)
+    uncovered = [claim for claim in group.claims
+                 if claim != group.representative and relevance_score(shared_text, claim) < DOC_MIN_COVERAGE]
+    outputs = concurrent_map(
+        lambda claim: run_selected_tools({
+            "user_input": claim,
+            "selected_tools": group.selected_tools,
+            "mode": mode,
+        })["tool_outputs"],
+        uncovered, max_workers=DOC_WORKERS,
+    )
+    group.claim_outputs = dict(zip(uncovered, outputs))
+    return group
+
+
+def verify_document(source: str, mode: str = "full",
+                    on_progress: Optional[Callable[[str], None]] = None) -> DocumentReport:
+    """
+    Extracts, groups and verifies all claims in a URL or block of text.
+
+    Cost: one extraction call, then per group one routing call and one tool run (plus
+    a tool run per claim the shared evidence does not cover), and one verdict call per
+    claim. on_progress, if given, receives a short message after each stage.
+    """
+    progress = on_progress or (lambda message: None)
+    text = load_document(source)
+    claims = extract_claims(text)
+    groups = group_claims(claims)
+    progress(f"🧾 Extracted {len(claims)} claims in {len(groups)} groups")
+
+    concurrent_map(lambda group: gather_group_evidence(group, mode), groups, max_workers=DOC_WORKERS)
+    extra = sum(len(group.claim_outputs) for group in groups)
+    progress(f"🔧 Gathered evidence ({len(groups)} group runs, {extra} claim-specific runs)")
+
+    jobs = [(g, claim) for g, group in enumerate(groups) for claim in group.claims]
+    verdicts = concurrent_map(
+        lambda job: evaluate_claim_node({
+            "user_input": job[1],
+            "tool_outputs": groups[job[0]].evidence_for(job[1]),
+            "mode": mode,
+        })["final_verdict"],
+        jobs, max_workers=DOC_WORKERS,
+    )
+
+    progress("⚖️ Reached verdicts")
+
+    # Report claims in document order
+    order = {claim: i for i, claim in enumerate(claims)}
+    results = sorted((ClaimVerdict(claim, g, verdict) for (g, claim), verdict in zip(jobs, verdicts)),
+                     key=lambda r: order[r.claim])
+    return DocumentReport(source=source, claims=results, groups=groups)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract and verify all claims in an article.")
+    parser.add_argument("source", help="Article URL or path to a text file.")
+    parser.add_argument("--mode", choices=["full", "fast"], default="full")
+    args = parser.parse_args()
+
+    source = args.source
+    if os.path.exists(source):
+        with open(source, encoding="utf-8") as f:
+            source = f.read()
+
+    report = verify_document(source, args.mode)
+    print(f"🧾 {len(report.claims)} claims in {len(report.groups)} groups")
+    for result in report.claims:
+        group = report.groups[result.group]
+        searched = " (own search)" if result.claim in group.claim_outputs else ""
+        print(f"\n[{result.group + 1}] {result.claim}{searched}\n    tools: {', '.join(group.selected_tools)}")
+        print("    " + result.verdict.replace("\n", "\n    "))
@@ -0,0 +1,155 @@
+# evidence.py
+
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List
+from urllib.parse import urlparse
+
+
+# === Evidence Record ===
+@dataclass(slots=True)
+class Evidence:
+    """
+    Compact record for a single piece of evidence returned by a tool.
+
+    Tools return lists of these instead of pre-rendered markdown so the graph
+    state stays small and evidence can be deduplicated or budgeted per item.
+
+    Attributes:
+        source (str): Where the evidence came from (domain, journal, "Wikipedia", ...).
+        title (str): Article / paper / page title.
+        url (str): Link to the evidence.
+        date (str): Publication date or year, if known.
+        summary (str): Claim-focused summary (or error message starting with "❌").
+        abstract (str): Short source-provided text (snippet or abstract).
+        raw_length (int): Length in characters of the full text that was summarized.
+    """
+    source: str
+    title: str = ""
+    url: str = ""
+    date: str = ""
+    summary: str = ""
+    abstract: str = ""
+    raw_length: int = 0
+
+    @property
+    def is_error(self) -> bool:
+        return self.summary.startswith("❌")
+
+    @property
+    def context_field(self) -> str:
+        """
+        Field sent to the verdict LLM: summaries not backed by full text fall back
+        to the source-provided abstract.
+        """
+        return "summary" if self.raw_length or not self.abstract else "abstract"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# === Helpers ===
+def error_evidence(source: str, message: str) -> List[Evidence]:
+    """
+    Wraps a tool error message in a single-item evidence list.
+    """
+    return [Evidence(source=source, summary=message)]
+
+
+def source_from_url(url: str, default: str = "") -> str:
+    """
+    Returns the bare domain of a URL (e.g. "nytimes.com"), used as evidence source.
+    """
+    netloc = urlparse(url or "").netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    return netloc or default
+
+
+def dedupe_evidence(records: Iterable[Evidence]) -> List[Evidence]:
+    """
+    Drops repeated evidence (same URL, or same title when no URL is present),
+    keeping the first occurrence.
+    """
+    seen = set()
+    unique = []
+    for record in records:
+        key = record.url or record.title or record.summary
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(record)
+    return unique
+
+
+def budget_evidence(records: List[Evidence], max_chars: int) -> List[Evidence]:
+    """
+    Trims the text each record contributes to the verdict context (its summary, or
+    its abstract for abstract-only records) so the combined length fits within
+    max_chars, splitting the budget evenly between records.
+    """
+    if not records:
+        return []
+
+    per_record = max(max_chars // len(records), 1)
+    budgeted = []
+    for record in records:
+        field = record.context_field
+        text = getattr(record, field)
+        if len(text) > per_record:
+            record = Evidence(**{**record.to_dict(), field: text[:per_record].rstrip() + "…"})
+        budgeted.append(record)
+    return budgeted
+
+
+def evidence_to_context(tool_outputs: Dict[str, List[Evidence]], max_chars: int = 24000) -> str:
+    """
+    Formats evidence from all tools as plain text for the verdict LLM.
+
+    Evidence is deduplicated across tools and budgeted to max_chars overall.
+    """
+    all_records = dedupe_evidence(
+        record for records in tool_outputs.values() for record in records
+    )
+    budgeted = {id(r): b for r, b in zip(all_records, budget_evidence(all_records, max_chars))}
+
+    blocks = []
+    for tool, records in tool_outputs.items():
+        lines = []
+        for record in records:
+            if id(record) not in budgeted:
+                continue  # duplicate of evidence already listed under another tool
+            record = budgeted[id(record)]
+            header = " | ".join(part for part in (record.title, record.source, record.date) if part)
+            if header:
+                lines.append(f"- {header}")
+            lines.append(getattr(record, record.context_field))
+        if lines:
+            blocks.append(f"🔎 Source: {tool}\n" + "\n".join(lines))
+
+    return "\n\n".join(blocks)
+
+
+# === Markdown Rendering (Streamlit pages) ===
+def render_evidence(records: List[Evidence]) -> str:
+    """
+    Renders a tool's evidence records as markdown for the Streamlit output panels.
+    """
+    if not records:
+        return "No results found."
+
+    blocks = []
+    for i, record in enumerate(records, start=1):
+        if record.is_error:
+            blocks.append(record.summary)
+            continue
+
+        meta = f"{record.source} ({record.date})" if record.date else record.source
+        block = f"**{i}. {record.title}** — _{meta}_\n"
+        if record.url:
+            block += f"🔗 [{record.url}]({record.url})\n"
+        if record.abstract and record.abstract not in record.summary:
+            block += f"\n📌 {record.abstract}\n"
+        block += f"\n🔎 **Focused Summary:**\n{record.summary}\n"
+        blocks.append(block)
+
+    return "\n\n".join(blocks)
@@ -0,0 +1,341 @@
+# evidence_index.py
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+import numpy as np
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from evidence import Evidence, dedupe_evidence
+from utils import tokenize
+
+# === Index Configuration (overridable via .env) ===
+load_dotenv()
+INDEX_ENABLED = os.getenv("EVIDENCE_INDEX_ENABLED", "1") == "1"
+INDEX_DIR = os.getenv("EVIDENCE_INDEX_DIR", os.path.join(".cache", "evidence_index"))
+INDEX_DIM = int(os.getenv("EVIDENCE_INDEX_DIM", "1024"))
+INDEX_TTL_SECONDS = float(os.getenv("EVIDENCE_INDEX_TTL_DAYS", "14")) * 86400
+# Claim similarity at which a claim counts as a near-duplicate and its tools are skipped
+MATCH_THRESHOLD = float(os.getenv("EVIDENCE_INDEX_THRESHOLD", "0.92"))
+# Claim similarity at which earlier evidence is added as extra context (tools still run)
+RELATED_THRESHOLD = float(os.getenv("EVIDENCE_INDEX_RELATED_THRESHOLD", "0.6"))
+RELATED_MAX = int(os.getenv("EVIDENCE_INDEX_RELATED_MAX", "4"))
+
+_SCHEMA_VERSION = 2
+# Errors the index may raise; callers treat the index as an optimisation and carry on
+INDEX_ERRORS = (OSError, sqlite3.Error, ValueError)
+_INITIAL_CAPACITY = 1024
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        row        INTEGER PRIMARY KEY,  -- row of the claim vector in vectors.f32
+        tool       TEXT NOT NULL,        -- tool_outputs key the evidence came from
+        url        TEXT NOT NULL,
+        claim      TEXT NOT NULL,        -- claim the evidence was gathered for
+        mode       TEXT NOT NULL,        -- graph mode ("full" / "fast") the evidence was gathered in
+        created_at REAL NOT NULL,
+        evidence   TEXT NOT NULL         -- Evidence record as JSON
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_url ON entries (tool, mode, url)",
+]
+
+
+# === Local Hashing Embedding ===
+def embed(text: str, dim: int = INDEX_DIM) -> np.ndarray:
+    """
+    Embeds text as an L2-normalised signed feature-hashing vector of its content
+    words, word bigrams and character trigrams (so "vaccines" ~ "vaccine" and
+    "infertility" ~ "fertility"). Deterministic across processes (CRC32).
+    """
+    words = tokenize(text)
+    features = [(w, 1.0) for w in words]
+    features += [(f"{a} {b}", 1.0) for a, b in zip(words, words[1:])]
+    features += [(f"#{w[i:i + 3]}", 0.5) for w in words for i in range(len(w) - 2)]
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, weight in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += weight if (h >> 31) & 1 else -weight
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+# === Evidence Index ===
+class EvidenceIndex:
+    """
+    Index of previously gathered evidence, keyed by the claim it was gathered for.
+
+    Each row holds the embedding of the originating claim in a raw float32 file that
+    is memory-mapped and grown in place, with metadata in SQLite. Several processes
+    can share one directory: rows are assigned inside SQLite write transactions, and
+    the memory map is re-opened whenever another process has grown the file. The map
+    only pre-selects candidates; scores are recomputed from the stored claim text, so
+    a row renumbered by prune() in another process is never matched to the wrong claim.
+    """
+
+    def __init__(self, directory: str = INDEX_DIR, dim: int = INDEX_DIM, ttl_seconds: float = INDEX_TTL_SECONDS):
+        os.makedirs(directory, exist_ok=True)
+        self.dim = dim
+        self.ttl_seconds = ttl_seconds
+        self._db_path = os.path.join(directory, "entries.sqlite3")
+        self._vec_path = os.path.join(directory, "vectors.f32")
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            stored_dim = None
+            if version == _SCHEMA_VERSION:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+                stored_dim = int(row[0]) if row else None
+            if stored_dim != dim:
+                # Older layout (blended claim/evidence vectors) or another dimension: start over
+                conn.execute("DROP TABLE IF EXISTS entries")
+                conn.execute("DROP TABLE IF EXISTS meta")
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                conn.execute("INSERT INTO meta VALUES ('dim', ?)", (str(dim),))
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                for path in (self._vec_path, os.path.join(directory, "vectors.npy")):
+                    if os.path.exists(path):
+                        os.remove(path)
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+
+    def _rows_on_disk(self) -> int:
+        try:
+            return os.path.getsize(self._vec_path) // (4 * self.dim)
+        except OSError:
+            return 0
+
+    def _map(self) -> Optional[np.memmap]:
+        """
+        Returns the vector map, re-opened if the file was grown (here or by another
+        process). Call with self._lock held.
+        """
+        rows = self._rows_on_disk()
+        if rows == 0:
+            self._vectors = None
+        elif self._vectors is None or self._vectors.shape[0] != rows:
+            self._vectors = np.memmap(self._vec_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+        return self._vectors
+
+    def _ensure_capacity(self, needed: int) -> np.memmap:
+        """
+        Grows the vector file in place (same inode, so other processes' maps stay
+        valid) and returns a map with at least `needed` rows. Call inside a write
+        transaction with self._lock held.
+        """
+        capacity = self._rows_on_disk()
+        if needed > capacity:
+            capacity = max(capacity, _INITIAL_CAPACITY)
+            while capacity < needed:
+                capacity *= 2
+            with open(self._vec_path, "ab") as f:
+                f.truncate(capacity * 4 * self.dim)
+        return self._map()
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # --- Insert ---
+    def add(self, tool: str, claim: str, records: List[Evidence], mode: str = "full") -> int:
+        """
+        Adds evidence records gathered by a tool for a claim. Error records are skipped
+        and records whose URL is already indexed for the same claim, tool and mode are
+        only refreshed (other claims keep their own copy, with their own summary).
+
+        Returns:
+            int: Number of new rows inserted.
+        """
+        now = time.time()
+        inserted = 0
+        vector = embed(claim, self.dim)
+
+        with self._lock, closing(self._connect()) as conn:
+            # The write lock serialises row assignment across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for record in records:
+                    if record.is_error or not (record.summary or record.abstract):
+                        continue
+
+                    if record.url:
+                        updated = conn.execute(
+                            "UPDATE entries SET created_at = ? WHERE tool = ? AND mode = ? AND url = ? AND claim = ?",
+                            (now, tool, mode, record.url, claim),
+                        ).rowcount
+                        if updated:
+                            continue
+
+                    row = conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM entries").fetchone()[0]
+                    vectors = self._ensure_capacity(row + 1)
+                    vectors[row] = vector
+                    conn.execute(
+                        "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (row, tool, record.url, claim, mode, now, json.dumps(record.to_dict())),
+                    )
+                    inserted += 1
+
+                if inserted:
+                    self._vectors.flush()  # vectors reach the file before their rows become visible
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+        return inserted
+
+    # --- Query ---
+    def _hits(self, query: str, k: int, threshold: float,
+              mode: Optional[str]) -> List[Tuple[float, str, str, Evidence]]:
+        """
+        Up to k unexpired (score, tool, claim, evidence) hits, best first.
+        """
+        q = embed(query, self.dim)
+        with self._lock:
+            vectors = self._map()
+            if vectors is None:
+                return []
+            scores = np.asarray(vectors @ q)
+
+        # Over-fetch candidates so expired, other-mode or stale rows can be filtered out afterwards
+        n = min(len(scores), k * 4)
+        candidates = np.argpartition(-scores, n - 1)[:n]
+        candidates = [int(i) for i in candidates if scores[i] >= threshold]
+        if not candidates:
+            return []
+
+        cutoff = time.time() - self.ttl_seconds
+        placeholders = ",".join("?" * len(candidates))
+        sql = f"SELECT tool, claim, evidence FROM entries WHERE row IN ({placeholders}) AND created_at >= ?"
+        params = [*candidates, cutoff]
+        if mode is not None:
+            sql += " AND mode = ?"
+            params.append(mode)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        # Score on the stored claim text, not the mapped row, which may be stale
+        claim_scores: Dict[str, float] = {}
+        hits = []
+        for tool, claim, evidence in rows:
+            if claim not in claim_scores:
+                claim_scores[claim] = float(embed(claim, self.dim) @ q)
+            if claim_scores[claim] >= threshold:
+                hits.append((claim_scores[claim], tool, claim, Evidence(**json.loads(evidence))))
+        hits.sort(key=lambda hit: -hit[0])
+        return hits[:k]
+
+    def search(self, query: str, k: int = 8, threshold: float = MATCH_THRESHOLD,
+               mode: Optional[str] = None) -> List[Tuple[float, str, Evidence]]:
+        """
+        Returns up to k unexpired (score, tool, evidence) hits whose originating claim has
+        cosine similarity to the query at or above threshold, best first. With mode, only
+        evidence gathered in that mode is returned.
+        """
+        return [(score, tool, record) for score, tool, _, record in self._hits(query, k, threshold, mode)]
+
+    def lookup(self, claim: str, mode: str = "full",
+               threshold: float = MATCH_THRESHOLD) -> Dict[str, List[Evidence]]:
+        """
+        Returns all evidence gathered in the same mode for the closest near-duplicate
+        earlier claim, grouped by the tool that produced it. Every record the claim has
+        for a tool is returned, so tools found here do not need to run again.
+        """
+        best = self._hits(claim, 1, threshold, mode)
+        if not best:
+            return {}
+
+        cutoff = time.time() - self.ttl_seconds
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT tool, evidence FROM entries WHERE claim = ? AND mode = ? AND created_at >= ? ORDER BY row",
+                (best[0][2], mode, cutoff),
+            ).fetchall()
+
+        grouped: Dict[str, List[Evidence]] = {}
+        for tool, evidence in rows:
+            grouped.setdefault(tool, []).append(Evidence(**json.loads(evidence)))
+        return grouped
+
+    def related(self, claim: str, mode: str = "full", k: int = RELATED_MAX,
+                threshold: float = RELATED_THRESHOLD) -> List[Evidence]:
+        """
+        Returns evidence gathered for similar (but not necessarily equivalent) earlier
+        claims. It is only extra context for the verdict; tools still run.
+        """
+        # Several earlier claims may hold the same URL; keep its best-scoring copy
+        hits = self.search(claim, k=k * 2, threshold=threshold, mode=mode)
+        return dedupe_evidence(record for _, _, record in hits)[:k]
+
+    # --- Maintenance ---
+    def prune(self) -> int:
+        """
+        Removes entries older than the TTL and compacts the vector rows.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        cutoff = time.time() - self.ttl_seconds
+
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,)).rowcount
+                if removed == 0:
+                    conn.rollback()
+                    return 0
+
+                kept = [row for (row,) in conn.execute("SELECT row FROM entries ORDER BY row")]
+                vectors = self._map()
+                # Compact: move surviving rows to the front, renumbering them in order
+                for new_row, old_row in enumerate(kept):
+                    if new_row != old_row:
+                        vectors[new_row] = vectors[old_row]
+                        conn.execute("UPDATE entries SET row = ? WHERE row = ?", (new_row, old_row))
+                if vectors is not None:
+                    vectors[len(kept):] = 0.0
+                    vectors.flush()
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+        return removed
+
+
+# === Shared Instance ===
+_index: Optional[EvidenceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_evidence_index() -> Optional[EvidenceIndex]:
+    """
+    Returns the process-wide evidence index (pruned on first use),
+    or None if disabled via EVIDENCE_INDEX_ENABLED=0 or unavailable.
+    """
+    global _index
+    if not INDEX_ENABLED:
+        return None
+
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = EvidenceIndex()
+                _index.prune()
+            except INDEX_ERRORS:
+                return None  # index is an optimisation; run without it
+        return _index
@@ -0,0 +1,259 @@
+# job_queue.py
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+# === Queue Configuration (overridable via .env) ===
+# JOB_QUEUE_URL selects the backend: "sqlite:///path/to/jobs.sqlite3" ships with the repo;
+# other backends (Redis, SQS, ...) plug in via register_backend() under their own scheme.
+load_dotenv()
+JOB_QUEUE_URL = os.getenv("JOB_QUEUE_URL", "sqlite:///" + os.path.join(".cache", "jobs.sqlite3"))
+JOB_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "30"))
+
+# Job lifecycle: queued → running → done | failed (running jobs whose lease expires
+# become visible again and are retried until max_attempts is reached)
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass(slots=True)
+class Job:
+    id: str
+    queue: str
+    kind: str                 # handler name, e.g. "verify"
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = JOB_MAX_ATTEMPTS
+    lease_owner: str = ""     # worker id holding the job while running
+    result: Optional[Dict[str, Any]] = None
+    error: str = ""
+    created_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+
+class LeaseLost(RuntimeError):
+    """Raised when a worker reports on a job whose lease expired and was taken over."""
+
+
+# === Queue Interface ===
+class JobQueue(ABC):
+    """
+    At-least-once job queue. A claimed job is invisible to other workers until its
+    visibility timeout expires; workers extend the lease while they are still busy
+    and either complete or fail the job. Handlers must therefore be safe to re-run.
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, payloads: List[Dict[str, Any]], queue: str = "default",
+                max_attempts: int = JOB_MAX_ATTEMPTS) -> List[str]:
+        """Adds one job per payload and returns their ids."""
+
+    @abstractmethod
+    def claim(self, worker_id: str, queue: str = "default",
+              visibility_timeout: float = JOB_VISIBILITY_TIMEOUT) -> Optional[Job]:
+        """Leases the oldest visible job to worker_id, or returns None if there is none."""
+
+    @abstractmethod
+    def extend(self, job_id: str, worker_id: str, visibility_timeout: float = JOB_VISIBILITY_TIMEOUT) -> None:
+        """Pushes back the lease of a job the worker still holds (raises LeaseLost otherwise)."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> None:
+        """Stores the result of a job the worker holds (raises LeaseLost otherwise)."""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float = JOB_RETRY_DELAY) -> None:
+        """Records a failed attempt: the job is retried after retry_delay or, out of attempts, marked failed."""
+
+    @abstractmethod
+    def get(self, job_ids: List[str]) -> List[Job]:
+        """Returns the current state of the given jobs."""
+
+    @abstractmethod
+    def counts(self, queue: str = "default") -> Dict[str, int]:
+        """Returns the number of jobs per status."""
+
+
+# === SQLite Backend ===
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id            TEXT PRIMARY KEY,
+        queue         TEXT NOT NULL,
+        kind          TEXT NOT NULL,
+        payload       TEXT NOT NULL,            -- JSON
+        status        TEXT NOT NULL,
+        attempts      INTEGER NOT NULL DEFAULT 0,
+        max_attempts  INTEGER NOT NULL,
+        available_at  REAL NOT NULL,            -- queued: not before; running: lease expiry
+        lease_owner   TEXT NOT NULL DEFAULT '',
+        result        TEXT,                     -- JSON
+        error         TEXT NOT NULL DEFAULT '',
+        created_at    REAL NOT NULL,
+        started_at    REAL NOT NULL DEFAULT 0,
+        finished_at   REAL NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_visible ON jobs (queue, status, available_at)",
+]
+
+_COLUMNS = ("id, queue, kind, payload, status, attempts, max_attempts, lease_owner, "
+            "result, error, created_at, started_at, finished_at")
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a local SQLite file (WAL mode), shared by all worker processes on a
+    machine. Claims run in an IMMEDIATE transaction so two workers never lease the
+    same job. For workers on several machines use a networked backend.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are opened explicitly where needed
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _row_to_job(row) -> Job:
+        (job_id, queue, kind, payload, status, attempts, max_attempts, lease_owner,
+         result, error, created_at, started_at, finished_at) = row
+        return Job(job_id, queue, kind, json.loads(payload), status, attempts, max_attempts, lease_owner,
+                   json.loads(result) if result else None, error, created_at, started_at, finished_at)
+
+    def enqueue(self, kind, payloads, queue="default", max_attempts=JOB_MAX_ATTEMPTS):
+        now = time.time()
+        ids = [uuid.uuid4().hex for _ in payloads]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO jobs (id, queue, kind, payload, status, max_attempts, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(job_id, queue, kind, json.dumps(payload), QUEUED, max_attempts, now, now + i * 1e-6)
+                 for i, (job_id, payload) in enumerate(zip(ids, payloads))],
+            )
+            conn.execute("COMMIT")
+        return ids
+
+    def claim(self, worker_id, queue="default", visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that used up their attempts will not be retried
+                conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, lease_owner = '', "
+                    "error = CASE WHEN error = '' THEN 'visibility timeout expired' ELSE error END "
+                    "WHERE queue = ? AND status = ? AND available_at <= ? AND attempts >= max_attempts",
+                    (FAILED, now, queue, RUNNING, now),
+                )
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE queue = ? AND status IN (?, ?) AND available_at <= ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (queue, QUEUED, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+
+                conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                    "available_at = ?, started_at = ? WHERE id = ?",
+                    (RUNNING, worker_id, now + visibility_timeout, now, row[0]),
+                )
+                job = self._row_to_job(conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", row).fetchone())
+                conn.execute("COMMIT")
+                return job
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _update_leased(self, job_id: str, worker_id: str, sql: str, params: tuple) -> None:
+        with closing(self._connect()) as conn:
+            updated = conn.execute(
+                f"{sql} WHERE id = ? AND status = ? AND lease_owner = ?",
+                (*params, job_id, RUNNING, worker_id),
+            ).rowcount
+        if not updated:
+            raise LeaseLost(f"job {job_id} is no longer leased to {worker_id}")
+
+    def extend(self, job_id, worker_id, visibility_timeout=JOB_VISIBILITY_TIMEOUT):
+        self._update_leased(job_id, worker_id, "UPDATE jobs SET available_at = ?",
+                            (time.time() + visibility_timeout,))
+
+    def complete(self, job_id, worker_id, result):
+        self._update_leased(job_id, worker_id,
+                            "UPDATE jobs SET status = ?, result = ?, finished_at = ?, lease_owner = ''",
+                            (DONE, json.dumps(result), time.time()))
+
+    def fail(self, job_id, worker_id, error, retry_delay=JOB_RETRY_DELAY):
+        now = time.time()
+        self._update_leased(
+            job_id, worker_id,
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, "
+            "available_at = ?, finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE 0 END, "
+            "error = ?, lease_owner = ''",
+            (FAILED, QUEUED, now + retry_delay, now, error),
+        )
+
+    def get(self, job_ids):
+        jobs = {}
+        with closing(self._connect()) as conn:
+            # Chunked to stay below SQLite's bound-parameter limit
+            for i in range(0, len(job_ids), 500):
+                chunk = job_ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                jobs.update((row[0], self._row_to_job(row)) for row in rows)
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+    def counts(self, queue="default"):
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs WHERE queue = ? GROUP BY status", (queue,))
+            return {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, **dict(rows.fetchall())}
+
+
+# === Backend Registry ===
+_BACKENDS: Dict[str, Callable[[str], JobQueue]] = {
+    "sqlite": SQLiteJobQueue,
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str], JobQueue]) -> None:
+    """
+    Registers a queue backend for JOB_QUEUE_URL scheme (the factory receives the rest of the URL).
+    """
+    _BACKENDS[scheme] = factory
+
+
+def get_job_queue(url: str = JOB_QUEUE_URL) -> JobQueue:
+    """
+    Opens the job queue named by a URL such as "sqlite:///.cache/jobs.sqlite3".
+
+    Raises:
+        ValueError: If no backend is registered for the URL's scheme.
+    """
+    scheme, sep, location = url.partition("://")
+    if not sep or scheme not in _BACKENDS:
+        raise ValueError(f"unsupported job queue URL {url!r} (known schemes: {', '.join(_BACKENDS)})")
+    return _BACKENDS[scheme](location[1:] if scheme == "sqlite" else location)
@@ -0,0 +1,160 @@
+# llm_batcher.py
+
+import os
+import threading
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+from dotenv import load_dotenv
+
+# === Micro-Batching Configuration (overridable via .env) ===
+# Concurrent claims each send a small router (and verdict) prompt. A MicroBatcher holds
+# requests for a short window, sends them as one numbered multi-item prompt and hands
+# each waiting claim its own answer. If the batched answer cannot be parsed, every claim
+# in the batch falls back to its own single call; provider errors are not retried that way.
+load_dotenv()
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "20"))      # 0 disables batching
+LLM_BATCH_MAX_ROUTER = int(os.getenv("LLM_BATCH_MAX_ROUTER", "16"))
+LLM_BATCH_VERDICTS = os.getenv("LLM_BATCH_VERDICTS", "0") == "1"         # verdict prompts carry full context
+LLM_BATCH_MAX_VERDICT = int(os.getenv("LLM_BATCH_MAX_VERDICT", "4"))
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class _Slot:
+    __slots__ = ("item", "done", "result", "error", "fallback")
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.fallback = False
+
+
+class _Batch:
+    __slots__ = ("slots", "full")
+
+    def __init__(self):
+        self.slots: List[_Slot] = []
+        self.full = threading.Event()
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Collects items submitted from concurrent threads into batches of up to max_batch.
+
+    The first caller of a batch waits up to window_ms (less if the batch fills), then
+    runs run_batch for everyone; other callers block until their result is ready. A
+    batch of one uses run_single. If run_batch raises ValueError (its response did not
+    parse into one answer per item), each caller runs run_single on its own thread;
+    any other exception is raised to every caller in the batch.
+
+    Args:
+        name (str): Name in batch_stats().
+        run_batch (Callable): Items -> results in the same order; raises ValueError if unparseable.
+        run_single (Callable): One item -> its result.
+    """
+
+    def __init__(self, name: str, run_batch: Callable[[List[T]], List[R]], run_single: Callable[[T], R],
+                 window_ms: float = LLM_BATCH_WINDOW_MS, max_batch: int = LLM_BATCH_MAX_ROUTER):
+        self.name = name
+        self.run_batch = run_batch
+        self.run_single = run_single
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        with _stats_lock:
+            _stats.setdefault(name, {"requests": 0, "batches": 0, "batched": 0, "fallbacks": 0})
+
+    def _count(self, **increments: int) -> None:
+        with _stats_lock:
+            for key, value in increments.items():
+                _stats[self.name][key] += value
+
+    def submit(self, item: T) -> R:
+        """
+        Returns the result for one item, batched with items submitted concurrently.
+        """
+        self._count(requests=1)
+        if self.window_ms <= 0 or self.max_batch <= 1:
+            return self.run_single(item)
+
+        slot = _Slot(item)
+        with self._lock:
+            leader = self._open is None
+            if leader:
+                self._open = _Batch()
+            batch = self._open
+            batch.slots.append(slot)
+            if len(batch.slots) >= self.max_batch:
+                self._open = None  # full: the next caller starts a new batch
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window_ms / 1000)
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+                slots = list(batch.slots)
+            self._dispatch(slots)
+
+        slot.done.wait()
+        if slot.fallback:
+            return self.run_single(item)
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _dispatch(self, slots: List[_Slot]) -> None:
+        try:
+            if len(slots) == 1:
+                try:
+                    slots[0].result = self.run_single(slots[0].item)
+                except Exception as e:
+                    slots[0].error = e
+                return
+
+            try:
+                results = self.run_batch([slot.item for slot in slots])
+                if len(results) != len(slots):
+                    raise ValueError(f"expected {len(slots)} results, got {len(results)}")
+            except ValueError:
+                # Unparseable answer: each caller retries alone
+                self._count(fallbacks=1)
+                for slot in slots:
+                    slot.fallback = True
+                return
+            except Exception as e:
+                # Provider errors (rate limits, timeouts) reach every caller instead of
+                # multiplying into one single call per item
+                for slot in slots:
+                    slot.error = e
+                return
+
+            self._count(batches=1, batched=len(slots))
+            for slot, result in zip(slots, results):
+                slot.result = result
+        finally:
+            for slot in slots:
+                slot.done.set()
+
+
+# === Reporting ===
+def batch_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns per batcher: requests submitted, multi-item batches sent, requests answered
+    by them, and batches that fell back to single calls.
+    """
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def reset_batch_stats() -> None:
+    with _stats_lock:
+        for stats in _stats.values():
+            for key in stats:
+                stats[key] = 0
@@ -0,0 +1,142 @@
+# llm_pool.py
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+from langchain_openai import ChatOpenAI
+from dotenv import load_dotenv
+
+# === Load Environment Variables ===
+load_dotenv()
+
+# === Model Tiers ===
+# Every LLM call names a role ("router", "summary", "verdict", "extract"). Summaries may also name
+# the tool they run for. The model is resolved per call, most specific first:
+#   OPENAI_MODEL_<ROLE>_<TOOL>  →  OPENAI_MODEL_<ROLE>  →  role default
+MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4o")
+MODEL_TEMP = float(os.getenv("OPENAI_TEMPERATURE", "0.0"))
+
+ROLE_DEFAULTS = {
+    "router": "gpt-4",
+    "verdict": "gpt-4",
+    "summary": MODEL_NAME,
+    "extract": MODEL_NAME,  # claim extraction in document mode
+}
+
+# USD per 1M tokens (input, output), used for cost estimates in evaluation reports
+MODEL_PRICES = {
+    "gpt-4": (30.00, 60.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+_clients: Dict[tuple, ChatOpenAI] = {}
+_overrides: Dict[str, str] = {}
+_usage: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _env_key(*parts: str) -> str:
+    return "_".join(["OPENAI_MODEL", *(p.upper().replace(" ", "_") for p in parts)])
+
+
+def model_for(role: str, tool: str = "") -> str:
+    """
+    Resolves the model name for a role (and optional tool), honouring overrides
+    set with model_overrides() before environment configuration.
+    """
+    for key in ([f"{role}.{tool}"] if tool else []) + [role]:
+        if key in _overrides:
+            return _overrides[key]
+
+    if tool and os.getenv(_env_key(role, tool)):
+        return os.getenv(_env_key(role, tool))
+    return os.getenv(_env_key(role)) or ROLE_DEFAULTS.get(role, MODEL_NAME)
+
+
+def get_llm(role: str, tool: str = "") -> ChatOpenAI:
+    """
+    Returns a shared ChatOpenAI client for the role's model. Clients are created
+    lazily and reused across modules, one per (model, temperature).
+    """
+    key = (model_for(role, tool), MODEL_TEMP)
+    with _lock:
+        if key not in _clients:
+            _clients[key] = ChatOpenAI(model=key[0], temperature=key[1])
+        return _clients[key]
+
+
+def invoke_llm(role: str, messages, tool: str = ""):
+    """
+    Invokes the role's model and records latency and token usage per model.
+
+    Args:
+        role (str): "router", "summary", "verdict", "extract", ...
+        messages: Prompt string or list of LangChain messages.
+        tool (str): Tool name for per-tool summary models (e.g. "Google").
+
+    Returns:
+        AIMessage: The model response.
+    """
+    llm = get_llm(role, tool)
+    start = time.perf_counter()
+    response = llm.invoke(messages)
+    elapsed = time.perf_counter() - start
+
+    usage = getattr(response, "usage_metadata", None) or {}
+    with _lock:
+        stats = _usage.setdefault(llm.model_name, {"calls": 0, "input_tokens": 0, "output_tokens": 0, "seconds": 0.0})
+        stats["calls"] += 1
+        stats["input_tokens"] += usage.get("input_tokens", 0)
+        stats["output_tokens"] += usage.get("output_tokens", 0)
+        stats["seconds"] += elapsed
+
+    return response
+
+
+# === Usage & Cost Tracking ===
+def usage_snapshot() -> Dict[str, Dict[str, float]]:
+    """
+    Returns a copy of per-model usage counters (calls, tokens, seconds).
+    """
+    with _lock:
+        return {model: dict(stats) for model, stats in _usage.items()}
+
+
+def reset_usage() -> None:
+    with _lock:
+        _usage.clear()
+
+
+def estimate_cost(usage: Dict[str, Dict[str, float]]) -> Optional[float]:
+    """
+    Estimates USD cost of a usage snapshot. Returns None if any model has no known price.
+    """
+    total = 0.0
+    for model, stats in usage.items():
+        if model not in MODEL_PRICES:
+            return None
+        input_price, output_price = MODEL_PRICES[model]
+        total += stats["input_tokens"] / 1e6 * input_price + stats["output_tokens"] / 1e6 * output_price
+    return total
+
+
+# === Tier Overrides (used by evaluation) ===
+@contextmanager
+def model_overrides(overrides: Dict[str, str]):
+    """
+    Temporarily overrides models per role or role.tool, e.g.
+    {"router": "gpt-4o-mini", "summary": "gpt-4o-mini", "verdict": "gpt-4o"}.
+    """
+    global _overrides
+    previous = _overrides
+    _overrides = {**previous, **overrides}
+    try:
+        yield
+    finally:
+        _overrides = previous
@@ -0,0 +1,92 @@
+import streamlit as st
+from app_jobs import shared_executor, submit_document_job
+from document_mode import DocumentReport
+from evidence import render_evidence
+
+# === Streamlit Configuration ===
+# "Document Mode" page: verifies every checkable claim in a pasted article or URL.
+# Related claims share one evidence run (see document_mode.py), so a long article costs
+# a small multiple of a single claim instead of one full pipeline run per sentence.
+# The document is verified as a background job (app_jobs.py) while the page polls it.
+
+st.set_page_config(page_title="Document Mode – Truth Chain", layout="wide")
+
+st.session_state.setdefault("doc_job", None)     # running DocumentJob
+st.session_state.setdefault("doc_report", None)  # last finished DocumentReport
+st.session_state.setdefault("doc_error", None)
+
+
+def render_report(report: DocumentReport) -> None:
+    if not report.claims:
+        st.warning("⚠️ No checkable claims found in this document.")
+        return
+
+    st.caption(f"{len(report.claims)} claims verified with {len(report.groups)} evidence runs")
+
+    # --- Verdicts (document order) ---
+    st.subheader("📣 Verdicts")
+    for result in report.claims:
+        st.markdown(f"**{result.claim}**")
+        st.success(result.verdict)
+
+    # --- Shared Evidence per Group ---
+    st.subheader("📚 Evidence by Claim Group")
+    for i, group in enumerate(report.groups, start=1):
+        with st.expander(f"Group {i}: {group.representative} ({len(group.claims)} claims)"):
+            st.markdown("**Claims:** " + " · ".join(group.claims))
+            st.markdown(f"**Tools Used:** {', '.join(group.selected_tools)}")
+            for tool, records in group.tool_outputs.items():
+                st.markdown(f"##### {tool}")
+                st.markdown(render_evidence(records))
+            # Claims the shared evidence did not cover were searched on their own
+            for claim, outputs in group.claim_outputs.items():
+                st.markdown(f"##### Own search: {claim}")
+                for tool, records in outputs.items():
+                    st.markdown(f"###### {tool}")
+                    st.markdown(render_evidence(records))
+
+
+# --- User Input Section ---
+source = st.text_area("🔗 Article URL or text:", height=200, placeholder="https://... or paste the article text")
+fast_mode = st.toggle(
+    "⚡ Fast mode",
+    help="Skip per-article LLM summaries and reason directly over claim-ranked passages. Faster, slightly less precise."
+)
+
+# --- On Verify Button Click ---
+if st.button("🔎 Verify Document"):
+    if not source.strip():
+        st.warning("⚠️ Please enter an article URL or text before clicking verify.")
+    elif st.session_state.doc_job is not None:
+        st.info("⏳ A document is already being verified in this session.")
+    else:
+        st.session_state.doc_error = None
+        st.session_state.doc_job = submit_document_job(shared_executor(), source, "fast" if fast_mode else "full")
+
+
+# --- Running Job (polled while in flight) ---
+@st.fragment(run_every=1.0 if st.session_state.doc_job is not None else None)
+def poll_document_job() -> None:
+    job = st.session_state.doc_job
+    if job is None:
+        return
+
+    if job.done:
+        st.session_state.doc_job = None
+        error = job.future.exception()
+        if error is None:
+            st.session_state.doc_report = job.future.result()
+        else:
+            st.session_state.doc_error = str(error)
+        st.rerun()  # full rerun so the report renders
+
+    status = " → ".join(job.steps) if job.steps else ("🧾 Extracting claims..." if job.started else "⏳ Queued")
+    st.info(status)
+
+
+poll_document_job()
+
+if st.session_state.doc_error:
+    st.error(st.session_state.doc_error)
+elif st.session_state.doc_report is not None:
+    render_report(st.session_state.doc_report)
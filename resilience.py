@@ -0,0 +1,360 @@
+# resilience.py
+
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+from dotenv import load_dotenv
+
+# === Resilience Configuration (overridable via .env) ===
+load_dotenv()
+REQUEST_BUDGET_SECONDS = float(os.getenv("REQUEST_BUDGET_SECONDS", "90"))
+MIN_CALL_TIMEOUT = 1.0               # never hand out a timeout shorter than this
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "60"))
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "3.0"))  # until enough latency samples exist
+# Responses about one resource (auth, paywall, missing page), not about the provider's health
+BENIGN_HTTP_STATUSES = frozenset({401, 403, 404, 410})
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("RESILIENCE_WORKERS", "16")), thread_name_prefix="resilience")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider's circuit breaker is open and the call is skipped."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the request budget is used up before a call can start."""
+
+
+class CallCancelled(RuntimeError):
+    """Raised by a call that stopped early because a hedged duplicate already won."""
+
+
+# === Request Deadlines ===
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def request_budget(seconds: float = REQUEST_BUDGET_SECONDS):
+    """
+    Sets a deadline for all calls made within the block (threads started via
+    this module inherit it). Nested budgets can only shorten the deadline.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(min(deadline, outer) if outer else deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left in the current request budget, or None if no budget is set.
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def call_timeout(default: float) -> float:
+    """
+    Per-call timeout: the call's own default, capped by what is left of the request budget.
+
+    Raises:
+        DeadlineExceeded: If the request budget is already used up.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("request budget exhausted")
+    return max(min(default, left), MIN_CALL_TIMEOUT)
+
+
+# === Latency Tracking ===
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies for a provider.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+# === Circuit Breaker ===
+class CircuitBreaker:
+    """
+    Opens after BREAKER_FAILURES consecutive failures and fails fast for the cooldown.
+    After the cooldown a single trial call is let through (half-open); its outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and time.monotonic() - self._opened_at < self.cooldown
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_running:
+                return False
+            self._trial_running = True  # half-open: let one call probe the provider
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self) -> None:
+        """
+        Ends a call that says nothing about provider health (e.g. our own budget ran out).
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            self._trial_running = False
+            if self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+def is_benign_error(error: BaseException) -> bool:
+    """
+    True for HTTP errors (requests.HTTPError and similar) with a BENIGN_HTTP_STATUSES status.
+    """
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) in BENIGN_HTTP_STATUSES
+
+
+def settle(cb: "CircuitBreaker", error: Optional[BaseException] = None, benign: tuple = ()) -> None:
+    """
+    Records the outcome of a call on its breaker: success, a benign error (the provider
+    answered), a call we abandoned ourselves (no verdict on health) or a failure.
+    """
+    if error is None or isinstance(error, benign) or is_benign_error(error):
+        cb.record_success()
+    elif isinstance(error, (DeadlineExceeded, CallCancelled)):
+        cb.release()  # our budget ran out / we abandoned the call; not the provider's fault
+    else:
+        cb.record_failure()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_registry_lock = threading.Lock()
+
+
+def breaker(provider: str) -> CircuitBreaker:
+    with _registry_lock:
+        return _breakers.setdefault(provider, CircuitBreaker())
+
+
+def latency(provider: str) -> LatencyTracker:
+    with _registry_lock:
+        return _latencies.setdefault(provider, LatencyTracker())
+
+
+def provider_health() -> Dict[str, str]:
+    """
+    Returns "open"/"closed" per provider, for logging and dashboards.
+    """
+    with _registry_lock:
+        items = list(_breakers.items())
+    return {name: "open" if b.is_open else "closed" for name, b in items}
+
+
+# === Guarded Calls ===
+def _submit(fn: Callable, *args, **kwargs):
+    # Copy the context so the worker thread sees the caller's deadline
+    ctx = contextvars.copy_context()
+    return _executor.submit(ctx.run, fn, *args, **kwargs)
+
+
+def concurrent_map(fn: Callable, items: Iterable, max_workers: int = 8) -> List:
+    """
+    Runs fn over items concurrently and returns the results in order. Each call runs
+    in a copy of the caller's context, so it shares the caller's request deadline.
+    A short-lived pool is used so nested guarded calls cannot starve the shared executor.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="fanout") as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def guarded_call(provider: str, fn: Callable, *args, timeout: Optional[float] = None,
+                 latency_key: Optional[str] = None, benign: tuple = (), **kwargs):
+    """
+    Calls fn through the provider's circuit breaker, recording latency.
+
+    With timeout, fn runs on a worker thread and the caller stops waiting after
+    call_timeout(timeout) seconds (for clients that have no timeout of their own).
+    Exceptions listed in benign (e.g. "page not found") and HTTP errors with a
+    BENIGN_HTTP_STATUSES status propagate without counting as provider failures.
+
+    Raises:
+        CircuitOpenError: If the provider is currently failing fast.
+        TimeoutError: If the call did not finish in time.
+    """
+    wait_timeout = None if timeout is None else call_timeout(timeout)
+    cb = breaker(provider)
+    if not cb.allow():
+        raise CircuitOpenError(f"{provider} is temporarily unavailable")
+
+    try:
+        if wait_timeout is None:
+            start = time.monotonic()
+            result = fn(*args, **kwargs)
+        else:
+            start, result = _run_with_timeout(provider, fn, args, kwargs, wait_timeout)
+    except _NotStarted as e:
+        cb.release()  # the provider never saw the request
+        raise TimeoutError(f"{provider} call did not start in time (workers busy)") from e
+    except FutureTimeout as e:
+        cb.record_failure()
+        raise TimeoutError(f"{provider} call timed out") from e
+    except Exception as e:
+        settle(cb, e, benign)
+        raise
+
+    cb.record_success()
+    latency(latency_key or provider).record(time.monotonic() - start)
+    return result
+
+
+class _NotStarted(Exception):
+    """The call was still queued for a worker when its time ran out (and was cancelled)."""
+
+
+def _run_with_timeout(provider: str, fn: Callable, args: tuple, kwargs: dict, wait_timeout: float):
+    """
+    Runs fn on the shared executor and waits up to wait_timeout from the moment it
+    starts, so time spent queued for a worker is not blamed on the provider. The wait
+    never extends past the request deadline.
+
+    Returns:
+        tuple: (start time, result).
+
+    Raises:
+        _NotStarted: If no worker picked the call up within wait_timeout.
+        FutureTimeout: If the call ran for wait_timeout without finishing.
+        DeadlineExceeded: If the request budget ran out first.
+    """
+    started = threading.Event()
+    start_time: List[float] = []
+
+    def run():
+        start_time.append(time.monotonic())
+        started.set()
+        return fn(*args, **kwargs)
+
+    future = _submit(run)
+    if not started.wait(wait_timeout) and future.cancel():
+        raise _NotStarted(provider)
+    started.wait()  # picked up just as the wait ended
+
+    start = start_time[0]
+    limit = start + wait_timeout
+    deadline = _deadline.get()
+    cut_by_budget = deadline is not None and deadline < limit
+    try:
+        result = future.result(timeout=max((deadline if cut_by_budget else limit) - time.monotonic(), 0))
+    except FutureTimeout:
+        future.cancel()
+        if cut_by_budget:
+            raise DeadlineExceeded("request budget exhausted") from None
+        raise
+    return start, result
+
+
+def hedged_call(provider: str, fn: Callable, *args, timeout: float = 20.0, latency_key: Optional[str] = None,
+                cancellable: bool = False, benign: tuple = (), guard: bool = True, **kwargs):
+    """
+    Runs fn through guarded_call and, if it has not finished after the provider's
+    p95 latency, starts one duplicate attempt. Returns whichever succeeds first.
+
+    Args:
+        provider (str): Breaker key (e.g. "article:nytimes.com").
+        fn (Callable): The call to make; must be safe to run twice.
+        timeout (float): Overall timeout, capped by the request budget.
+        latency_key (str): Latency stats key shared across providers (e.g. "article").
+        cancellable (bool): Pass a shared `cancel` threading.Event to fn; it is set once
+            one attempt wins so the other can stop early.
+        benign (tuple): Exceptions that do not count as provider failures (see guarded_call).
+        guard (bool): Run attempts through guarded_call. With False, fn keeps its own breaker
+            accounting (e.g. keyed by the host it was redirected to) and provider only names the call.
+    """
+    key = latency_key or provider
+    cancel = threading.Event()
+    if cancellable:
+        kwargs["cancel"] = cancel
+    deadline = time.monotonic() + call_timeout(timeout)
+    hedge_delay = latency(key).percentile(0.95) or HEDGE_DEFAULT_DELAY
+
+    def attempt():
+        if guard:
+            return guarded_call(provider, fn, *args, latency_key=key, benign=benign, **kwargs)
+        start = time.monotonic()
+        result = fn(*args, **kwargs)
+        latency(key).record(time.monotonic() - start)
+        return result
+
+    futures = [_submit(attempt)]
+    done, _ = wait(futures, timeout=min(hedge_delay, max(deadline - time.monotonic(), 0)))
+
+    if not done and time.monotonic() < deadline and not (guard and breaker(provider).is_open):
+        futures.append(_submit(attempt))
+
+    error: Optional[BaseException] = None
+    pending = set(futures)
+    while pending:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            break
+        done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                cancel.set()
+                return future.result()
+            error = future.exception()
+
+    cancel.set()
+    for future in pending:
+        future.cancel()  # attempts still queued for a worker never start
+    if error is not None and not pending:
+        raise error
+    raise TimeoutError(f"{provider} call timed out")
@@ -0,0 +1,163 @@
+# reverify.py
+
+import os
+import re
+import time
+import argparse
+from typing import Dict, List, Tuple
+from dotenv import load_dotenv
+from LangGraph import evaluate_claim_node, get_remedy_graph
+from evidence import Evidence
+from resilience import concurrent_map, request_budget
+from utils import (
+    article_validators, content_hash, extract_document_text, extract_passages,
+    fetch_article, summarize_article_with_focus,
+)
+from verdict_store import StoredSource, StoredVerdict, list_claims, load_verdict, save_verdict
+
+load_dotenv()
+
+# === Watchlist Re-verification ===
+# Re-checks stored verdicts incrementally: each source is revalidated with a conditional
+# GET (If-None-Match / If-Modified-Since). Unchanged sources (304, or identical extracted
+# text) keep their stored summaries; only changed sources are re-summarized, and the
+# verdict LLM runs again only when at least one source changed.
+
+WATCHLIST_PATH = os.getenv("WATCHLIST_PATH", "watchlist.txt")
+REVALIDATE_WORKERS = int(os.getenv("REVALIDATE_WORKERS", "8"))
+
+# Versioned arXiv abstracts never change, so there is nothing to revalidate
+_IMMUTABLE_URL = re.compile(r"arxiv\.org/abs/[^/]+v\d+$")
+
+
+def record_from_state(state: dict) -> StoredVerdict:
+    """
+    Builds a storable verdict from a finished graph run, attaching the validators
+    (ETag, Last-Modified, content hash) captured when each source was fetched.
+    """
+    sources = []
+    for tool, records in (state.get("tool_outputs") or {}).items():
+        for record in records:
+            etag, last_modified, text_hash = (article_validators(record.url) if record.url else None) or ("", "", "")
+            sources.append(StoredSource(tool, record, etag, last_modified, text_hash))
+
+    return StoredVerdict(
+        claim=state["user_input"],
+        mode=state.get("mode") or "full",
+        selected_tools=state.get("selected_tools") or [],
+        verdict=state.get("final_verdict") or "",
+        verified_at=time.time(),
+        sources=sources,
+    )
+
+
+def revalidate_source(source: StoredSource, claim: str, mode: str) -> Tuple[str, StoredSource]:
+    """
+    Revalidates one source with a conditional request.
+
+    Returns:
+        Tuple[str, StoredSource]: Status ("skipped", "not-modified", "unchanged",
+        "changed" or "unreachable") and the source to store (re-summarized if changed).
+    """
+    record = source.evidence
+    if record.is_error or not record.url or _IMMUTABLE_URL.search(record.url):
+        return "skipped", source
+
+    headers = {}
+    if source.etag:
+        headers["If-None-Match"] = source.etag
+    if source.last_modified:
+        headers["If-Modified-Since"] = source.last_modified
+
+    try:
+        doc = fetch_article(record.url, headers=headers)
+    except Exception:
+        return "unreachable", source  # keep the stored evidence
+
+    if doc.status == 304:
+        return "not-modified", source
+
+    text = extract_document_text(doc)
+    if not text:
+        return "unreachable", source
+
+    text_hash = content_hash(text)
+    refreshed = StoredSource(source.tool, record, doc.etag, doc.last_modified, text_hash)
+
+    # Without a stored hash the first pass only records a baseline
+    if not source.content_hash or text_hash == source.content_hash:
+        return "unchanged", refreshed
+
+    if mode == "fast":
+        summary = extract_passages(text, focus=claim)
+    else:
+        summary = summarize_article_with_focus(text, focus=claim, tool=source.tool)
+    refreshed.evidence = Evidence(**{**record.to_dict(), "summary": summary, "raw_length": len(text)})
+    return "changed", refreshed
+
+
+def reverify_claim(claim: str, mode: str = "full") -> Dict:
+    """
+    Re-verifies one claim: a full graph run if it has no stored verdict, otherwise
+    an incremental pass over its stored sources.
+
+    Returns:
+        Dict: Claim, per-status source counts, whether the verdict LLM ran, and the verdict.
+    """
+    stored = load_verdict(claim)
+
+    if stored is None:
+        state = get_remedy_graph().invoke({"user_input": claim, "mode": mode})
+        save_verdict(record_from_state(state))
+        return {"claim": claim, "new": True, "verdict_rerun": True, "verdict": state.get("final_verdict", "")}
+
+    with request_budget():
+        results = concurrent_map(lambda s: revalidate_source(s, stored.claim, stored.mode),
+                                 stored.sources, max_workers=REVALIDATE_WORKERS)
+
+    counts: Dict[str, int] = {}
+    for status, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+
+    updated = StoredVerdict(
+        claim=stored.claim,
+        mode=stored.mode,
+        selected_tools=stored.selected_tools,
+        verdict=stored.verdict,
+        verified_at=time.time(),
+        sources=[source for _, source in results],
+    )
+
+    # Only ask the verdict LLM again if the evidence actually changed
+    rerun = counts.get("changed", 0) > 0
+    if rerun:
+        state = evaluate_claim_node({
+            "user_input": stored.claim,
+            "tool_outputs": updated.tool_outputs(),
+            "mode": stored.mode,
+        })
+        updated.verdict = state["final_verdict"]
+
+    save_verdict(updated)
+    return {"claim": stored.claim, "new": False, "verdict_rerun": rerun, "verdict": updated.verdict, **counts}
+
+
+def load_watchlist(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-verify a watchlist of claims incrementally.")
+    parser.add_argument("claims", nargs="*", help="Claims to re-verify (default: watchlist file, else all stored claims).")
+    parser.add_argument("--watchlist", default=WATCHLIST_PATH, help="One claim per line.")
+    parser.add_argument("--mode", choices=["full", "fast"], default="full", help="Mode for claims verified for the first time.")
+    args = parser.parse_args()
+
+    claims = args.claims or (load_watchlist(args.watchlist) if os.path.exists(args.watchlist) else list_claims())
+
+    for claim in claims:
+        report = reverify_claim(claim, args.mode)
+        status = "🆕 new" if report["new"] else ("🔁 verdict re-run" if report["verdict_rerun"] else "✅ unchanged")
+        details = ", ".join(f"{k}={v}" for k, v in report.items() if k not in ("claim", "new", "verdict_rerun", "verdict"))
+        print(f"{status} | {claim[:60]} {('(' + details + ')') if details else ''}")
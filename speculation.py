@@ -0,0 +1,192 @@
+# speculation.py
+
+import os
+import json
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from evidence import Evidence
+
+# === Speculation Configuration (overridable via .env) ===
+# Tools the router picks most often (from routing history) start running at the same
+# time as the routing LLM call. RunTools then waits on the speculative result instead of
+# starting the tool; results of tools the router did not pick go to the evidence index.
+load_dotenv()
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "1") == "1"
+SPECULATION_MAX_TOOLS = int(os.getenv("SPECULATION_MAX_TOOLS", "2"))            # per claim
+SPECULATION_MIN_PROBABILITY = float(os.getenv("SPECULATION_MIN_PROBABILITY", "0.5"))
+SPECULATION_MAX_INFLIGHT = int(os.getenv("SPECULATION_MAX_INFLIGHT", "8"))      # across all claims
+SPECULATION_MIN_HISTORY = int(os.getenv("SPECULATION_MIN_HISTORY", "5"))        # claims routed before predicting
+ROUTING_HISTORY_PATH = os.getenv("ROUTING_HISTORY_PATH", os.path.join(".cache", "routing_history.json"))
+_HISTORY_WINDOW = 500  # counts are halved beyond this many claims, so recent routing dominates
+
+_executor = ThreadPoolExecutor(max_workers=SPECULATION_MAX_INFLIGHT, thread_name_prefix="speculate")
+_inflight = threading.BoundedSemaphore(SPECULATION_MAX_INFLIGHT)
+_stats_lock = threading.Lock()
+_stats = {"speculated": 0, "hits": 0, "wasted": 0, "misses": 0, "skipped_budget": 0}
+
+
+# === Routing History ===
+class RoutingHistory:
+    """
+    How often the router picked each tool, persisted as a small JSON file.
+    """
+
+    def __init__(self, path: str = ROUTING_HISTORY_PATH):
+        self.path = path
+        self.claims = 0.0
+        self.counts: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.claims, self.counts = float(data["claims"]), dict(data["tools"])
+        except (OSError, ValueError, KeyError):
+            pass  # no history yet
+
+    def record(self, tools: List[str]) -> None:
+        with self._lock:
+            self.claims += 1
+            for tool in set(tools):
+                self.counts[tool] = self.counts.get(tool, 0) + 1
+            if self.claims > _HISTORY_WINDOW:
+                self.claims /= 2
+                self.counts = {tool: count / 2 for tool, count in self.counts.items()}
+            snapshot = {"claims": self.claims, "tools": dict(self.counts)}
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # history is best-effort
+
+    def predict(self, max_tools: int = SPECULATION_MAX_TOOLS,
+                min_probability: float = SPECULATION_MIN_PROBABILITY) -> List[str]:
+        """
+        Tools picked for at least min_probability of recent claims, most likely first.
+        """
+        with self._lock:
+            if self.claims < SPECULATION_MIN_HISTORY:
+                return []
+            ranked = sorted(((count / self.claims, tool) for tool, count in self.counts.items()), reverse=True)
+        return [tool for p, tool in ranked if p >= min_probability][:max_tools]
+
+
+_history: Optional[RoutingHistory] = None
+_history_lock = threading.Lock()
+
+
+def routing_history() -> RoutingHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = RoutingHistory()
+        return _history
+
+
+# === Speculative Runs ===
+class Speculation:
+    """
+    Tool runs started for one claim before the router has answered.
+    """
+
+    def __init__(self, claim: str):
+        self.claim = claim
+        self.futures: Dict[str, Future] = {}
+
+    def take(self, tool: str) -> Optional[Dict[str, List[Evidence]]]:
+        """
+        Waits for and returns the speculative tool outputs for a selected tool,
+        or None if the tool was not speculated (or its run failed).
+        """
+        future = self.futures.get(tool)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception:
+            return None  # run the tool normally
+
+    def finish(self, selected: List[str], keep: Optional[Callable[[Dict[str, List[Evidence]]], None]] = None) -> None:
+        """
+        Records hit/miss statistics and hands results of unselected tools to keep
+        (e.g. the evidence index) once they complete; without keep they are discarded.
+        """
+        speculated, chosen = set(self.futures), set(selected)
+        with _stats_lock:
+            _stats["hits"] += len(speculated & chosen)
+            _stats["misses"] += len(chosen - speculated)
+            _stats["wasted"] += len(speculated - chosen)
+
+        def keep_result(future: Future) -> None:
+            if future.exception() is None and future.result():
+                keep(future.result())
+
+        if keep is not None:
+            for tool in speculated - chosen:
+                self.futures[tool].add_done_callback(keep_result)
+        self.futures.clear()
+
+
+def _release(_future) -> None:
+    _inflight.release()
+
+
+def speculate(claim: str, runner: Callable[[str], Dict[str, List[Evidence]]],
+              skip: frozenset = frozenset()) -> Speculation:
+    """
+    Starts the tools predicted from routing history for a claim, within the budget
+    (SPECULATION_MAX_TOOLS per claim, SPECULATION_MAX_INFLIGHT in flight overall).
+
+    Args:
+        claim (str): The claim being routed.
+        runner (Callable): Runs one tool by router name and returns its tool_outputs.
+        skip (frozenset): Tools not worth speculating (e.g. already answered from the index).
+    """
+    speculation = Speculation(claim)
+    if not SPECULATION_ENABLED:
+        return speculation
+
+    for tool in routing_history().predict():
+        if tool in skip:
+            continue
+        if not _inflight.acquire(blocking=False):
+            with _stats_lock:
+                _stats["skipped_budget"] += 1
+            break
+        ctx = contextvars.copy_context()
+        future = _executor.submit(ctx.run, runner, tool)
+        future.add_done_callback(_release)
+        speculation.futures[tool] = future
+        with _stats_lock:
+            _stats["speculated"] += 1
+
+    return speculation
+
+
+# === Reporting ===
+def speculation_stats() -> Dict[str, float]:
+    """
+    Returns speculative runs, hits (speculated and selected), wasted runs, misses
+    (selected but not speculated), runs skipped for budget, and the derived hit rate
+    (hits / speculated) and coverage (hits / selected).
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["hit_rate"] = round(stats["hits"] / stats["speculated"], 3) if stats["speculated"] else 0.0
+    selected = stats["hits"] + stats["misses"]
+    stats["coverage"] = round(stats["hits"] / selected, 3) if selected else 0.0
+    return stats
+
+
+def reset_speculation_stats() -> None:
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
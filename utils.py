@@ -1,27 +1,239 @@
 import requests
 import os
-import trafilatura
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from llm_pool import invoke_llm
+from evidence import source_from_url
+from resilience import CallCancelled, CircuitOpenError, breaker, call_timeout, hedged_call, settle
+from cpu_pool import html_to_text, pdf_to_text, run_cpu
 
 # === Load Environment Variables (e.g., API keys, secrets, configs) ===
 load_dotenv()
 
-# === Setup LLM (GPT-4o) ===
-MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4o")
-MODEL_TEMP = float(os.getenv("OPENAI_TEMPERATURE", "0.0"))
+# Summaries use the "summary" model tier (OPENAI_MODEL_SUMMARY[_<TOOL>], see llm_pool.py)
 
-llm = ChatOpenAI(model=MODEL_NAME, temperature=MODEL_TEMP)  # Configurable via .env
+
+# === Streaming Document Fetch ===
+ARTICLE_TIMEOUT = float(os.getenv("ARTICLE_TIMEOUT_SECONDS", "15"))
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(2 * 1024 * 1024)))
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+_CHUNK_SIZE = 64 * 1024
+_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; TruthChain/1.0)"}
+
+_HTML_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml")
+_PDF_TYPES = ("application/pdf", "application/x-pdf")
+
+
+class UnsupportedContent(ValueError):
+    """Raised when a response is not an extractable document (video, image, oversized PDF...)."""
+
+
+@dataclass(slots=True)
+class FetchedDocument:
+    """
+    Body and caching headers of one streamed HTTP response.
+    """
+    url: str
+    status: int
+    kind: str = ""            # "html" or "pdf" ("" for 304 Not Modified)
+    body: bytes = b""
+    truncated: bool = False   # HTML body was cut at the byte cap
+    etag: str = ""
+    last_modified: str = ""
+
+
+def _sniff(first_bytes: bytes) -> str:
+    head = first_bytes.lstrip(b"\xef\xbb\xbf \t\r\n")[:512].lower()
+    if head.startswith(b"%pdf"):
+        return "pdf"
+    if head.startswith(b"<"):
+        return "html"
+    return ""
+
+
+def fetch_document(link: str, max_bytes: int = ARTICLE_MAX_BYTES, timeout: float = ARTICLE_TIMEOUT,
+                   headers: Optional[dict] = None, cancel: Optional[threading.Event] = None,
+                   on_response: Optional[Callable[[str], None]] = None) -> FetchedDocument:
+    """
+    Stream a URL with bounded memory: headers and the first bytes decide whether the body
+    is worth downloading, and reading stops at the byte cap.
+
+    - HTML/text is read up to max_bytes (longer pages are truncated, not rejected).
+    - PDFs are read up to PDF_MAX_BYTES and rejected if larger.
+    - Anything else (video, images, archives, unknown binaries) is rejected before download.
+
+    Args:
+        link (str): URL to fetch.
+        max_bytes (int): Cap for HTML/text bodies.
+        timeout (float): Per-call timeout, capped by the request budget.
+        headers (dict): Extra request headers (e.g. If-None-Match for revalidation).
+        cancel (threading.Event): Stops reading when set (used to abandon a losing hedge).
+        on_response (Callable): Called with the final URL (after redirects) before the status
+            is checked or the body is read; may raise to abort the download.
+
+    Returns:
+        FetchedDocument: The (possibly truncated) body and its caching headers.
+
+    Raises:
+        UnsupportedContent: If the response is not an extractable document.
+    """
+    request_headers = {**_HEADERS, **(headers or {})}
+    with requests.get(link, stream=True, timeout=call_timeout(timeout), headers=request_headers) as response:
+        if on_response is not None:
+            on_response(response.url or link)
+        if response.status_code == 304:
+            return FetchedDocument(url=link, status=304,
+                                   etag=response.headers.get("ETag", ""),
+                                   last_modified=response.headers.get("Last-Modified", ""))
+        response.raise_for_status()
+
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        kind = "pdf" if content_type in _PDF_TYPES else "html" if content_type in _HTML_TYPES else ""
+        if not kind and content_type and not content_type.startswith("application/octet-stream"):
+            raise UnsupportedContent(f"unsupported content type {content_type}")
+
+        # Untyped bodies are checked once sniffed (a mislabelled PDF gets the PDF cap)
+        limit = PDF_MAX_BYTES if kind == "pdf" else max_bytes
+        declared = int(response.headers.get("Content-Length") or 0)
+        if kind == "pdf" and declared > limit:
+            raise UnsupportedContent(f"document too large ({declared} bytes)")
+
+        body = bytearray()
+        truncated = False
+        for chunk in response.iter_content(_CHUNK_SIZE):
+            if cancel is not None and cancel.is_set():
+                raise CallCancelled(f"fetch of {link} abandoned")
+            if not body:
+                # Trust the bytes over the header (servers mislabel PDFs and HTML)
+                kind = _sniff(chunk) or kind
+                if not kind:
+                    raise UnsupportedContent("body is neither HTML nor PDF")
+                limit = PDF_MAX_BYTES if kind == "pdf" else max_bytes
+                if kind == "pdf" and declared > limit:
+                    raise UnsupportedContent(f"document too large ({declared} bytes)")
+            body += chunk
+            if len(body) > limit:
+                if kind == "pdf":
+                    raise UnsupportedContent(f"PDF larger than {limit} bytes")
+                del body[limit:]
+                truncated = True
+                break
+
+        return FetchedDocument(
+            url=link,
+            status=response.status_code,
+            kind=kind,
+            body=bytes(body),
+            truncated=truncated,
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+        )
+
+
+def _article_provider(url: str) -> str:
+    return f"article:{source_from_url(url)}"
+
+
+def fetch_article(link: str, headers: Optional[dict] = None, cancel: Optional[threading.Event] = None) -> FetchedDocument:
+    """
+    fetch_document guarded by the circuit breaker of the site that actually serves the
+    article, i.e. the host after redirects. Resolver links (doi.org, news aggregators)
+    would otherwise share one breaker across every publisher behind them.
+
+    Errors before any response count against the requested host. Paywalls and missing
+    pages (401/403/404/410) and unsupported content do not count as failures.
+
+    Raises:
+        CircuitOpenError: If the requested or serving site is currently failing fast.
+    """
+    requested = _article_provider(link)
+    if breaker(requested).is_open:
+        raise CircuitOpenError(f"{requested} is temporarily unavailable")
+
+    serving: List[str] = []  # provider of the host that answered, once a response arrives
+
+    def check_serving_host(url: str) -> None:
+        provider = _article_provider(url)
+        if not breaker(provider).allow():
+            raise CircuitOpenError(f"{provider} is temporarily unavailable")
+        serving.append(provider)
+
+    try:
+        doc = fetch_document(link, headers=headers, cancel=cancel, on_response=check_serving_host)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        settle(breaker(serving[0] if serving else requested), e, benign=(UnsupportedContent,))
+        raise
+
+    settle(breaker(serving[0]))
+    return doc
+
+
+# === Text Extraction from Fetched Bytes ===
+# Both extractors are CPU-bound and run in the shared process pool (see cpu_pool.py)
+def extract_pdf_text(data: bytes) -> str:
+    """
+    Extract plain text from PDF bytes using PyMuPDF (no temp files).
+    """
+    return run_cpu(pdf_to_text, data, size=len(data))
+
+
+def extract_document_text(doc: FetchedDocument) -> str:
+    """
+    Extract main text from a fetched document: Trafilatura for HTML, PyMuPDF for PDFs.
+    Returns "" if nothing could be extracted.
+    """
+    if doc.kind == "pdf":
+        return extract_pdf_text(doc.body)
+    return run_cpu(html_to_text, doc.body, size=len(doc.body))
+
+
+# === Validators of Recently Fetched Articles ===
+# Kept so stored verdicts can later revalidate their sources with conditional requests
+_VALIDATORS_MAX = 4096
+_validators: "OrderedDict[str, Tuple[str, str, str]]" = OrderedDict()
+_validators_lock = threading.Lock()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _remember_validators(link: str, doc: FetchedDocument, text: str) -> None:
+    with _validators_lock:
+        _validators[link] = (doc.etag, doc.last_modified, content_hash(text))
+        _validators.move_to_end(link)
+        while len(_validators) > _VALIDATORS_MAX:
+            _validators.popitem(last=False)
+
+
+def article_validators(link: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Returns (etag, last_modified, content_hash) from the last successful get_article(link)
+    in this process, or None if the URL has not been fetched.
+    """
+    with _validators_lock:
+        return _validators.get(link)
 
 
 # === Article Extraction from URL ===
 def get_article(link: str) -> str:
     """
-    Fetch and extract the main article content from a given URL using Trafilatura.
+    Fetch and extract the main article content from a given URL.
 
-    This function first tries to use `trafilatura.fetch_url()` for optimized extraction.
-    If it fails, it falls back to a manual `requests` call + Trafilatura's HTML extractor.
+    The URL is streamed once (see fetch_document): oversized or non-document responses are
+    aborted early, linked PDFs go to the PDF extractor and HTML to Trafilatura.
+    The download is bounded by the request budget, hedged with a second attempt if it
+    is slower than the recent p95 article latency, and guarded by the circuit breaker of
+    the site serving it (see fetch_article) so an unhealthy site fails fast (callers then
+    fall back to snippets/abstracts).
 
     Args:
         link (str): The URL of the article to extract.
@@ -30,18 +242,15 @@ def get_article(link: str) -> str:
         str: Cleaned article text if successful, otherwise an error message.
     """
     try:
-        # Try direct fetch (Trafilatura handles redirects, canonical links, etc.)
-        downloaded = trafilatura.fetch_url(link)
-        if downloaded:
-            article_text = trafilatura.extract(downloaded)
-            if article_text:
-                return article_text.strip()
-
-        # Fallback: Raw HTML + extract
-        html = requests.get(link, timeout=10).text
-        article_text = trafilatura.extract(html)
+        doc = hedged_call(
+            _article_provider(link), fetch_article, link,
+            timeout=ARTICLE_TIMEOUT, latency_key="article", cancellable=True,
+            guard=False,  # fetch_article keys the breaker by the host after redirects
+        )
+        article_text = extract_document_text(doc)
         if article_text:
-            return article_text.strip()
+            _remember_validators(link, doc, article_text)
+            return article_text
 
         return "❌ Could not extract article text."
 
@@ -49,6 +258,79 @@ def get_article(link: str) -> str:
         return f"❌ Error fetching article: {e}"
 
 
+# === Local Relevance Scoring (no LLM) ===
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have how in into is it its
+may might more most no not of on or our over so such than that the their them then there these they
+this those to was we were what when which who will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercases text and splits it into content words (stopwords and 1-char tokens removed).
+    """
+    return [w for w in _WORD_RE.findall((text or "").lower()) if len(w) > 1 and w not in _STOPWORDS]
+
+
+def relevance_score(text: str, focus: str) -> float:
+    """
+    Scores how well a text covers a claim, as the fraction of the claim's
+    distinct content words that appear in the text.
+
+    Args:
+        text (str): Candidate text (abstract, snippet, passage).
+        focus (str): The claim or topic to score against.
+
+    Returns:
+        float: Score between 0.0 (no overlap) and 1.0 (all claim terms present).
+    """
+    focus_terms = set(tokenize(focus))
+    if not focus_terms:
+        return 0.0
+    return len(focus_terms & set(tokenize(text))) / len(focus_terms)
+
+
+# === Claim-Ranked Passage Extraction (fast mode, no LLM) ===
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def extract_passages(text: str, focus: str, max_passages: int = 4, sentences_per_passage: int = 2,
+                     max_chars: int = 75000) -> str:
+    """
+    Select the passages of an article that best cover the claim, without an LLM call.
+
+    The text is split into short windows of consecutive sentences, each window is scored
+    with relevance_score(), and the top windows are returned in document order.
+
+    Args:
+        text (str): The full article text.
+        focus (str): The claim to rank passages against.
+        max_passages (int): Number of passages to keep.
+        sentences_per_passage (int): Sentences per passage window.
+        max_chars (int): Only scan this many characters of the article.
+
+    Returns:
+        str: Selected passages joined by "…" separators, or an error message.
+    """
+    if not text or text.startswith("❌"):
+        return "❌ No article text to extract passages from."
+
+    sentences = [s.strip() for s in _SENTENCE_RE.split(text[:max_chars]) if s.strip()]
+    passages = [
+        " ".join(sentences[i:i + sentences_per_passage])
+        for i in range(0, len(sentences), sentences_per_passage)
+    ]
+
+    scored = [(relevance_score(p, focus), i) for i, p in enumerate(passages)]
+    top = sorted((pair for pair in scored if pair[0] > 0), reverse=True)[:max_passages]
+    if not top:
+        return passages[0][:1000] if passages else "❌ No article text to extract passages from."
+
+    return "\n…\n".join(passages[i] for _, i in sorted(top, key=lambda pair: pair[1]))
+
+
 # === Prompt Template for Focused Summarization ===
 FOCUSED_SUMMARY_PROMPT = PromptTemplate.from_template("""
 You are a helpful assistant. Summarize the following article **specifically in relation to** this statement:
@@ -64,7 +346,7 @@ Article:
 
 
 # === Focused Summarization ===
-def summarize_article_with_focus(text: str, focus: str, max_chars: int = 4000) -> str:
+def summarize_article_with_focus(text: str, focus: str, max_chars: int = 4000, tool: str = "") -> str:
     """
     Use LLM to generate a focused summary of the article with respect to a user-defined statement.
 
@@ -72,6 +354,7 @@ def summarize_article_with_focus(text: str, focus: str, max_chars: int = 4000) -
         text (str): The full article text (unstructured).
         focus (str): A claim or topic to filter and summarize the content by.
         max_chars (int): Truncate the article to this many characters (to fit prompt limits).
+        tool (str): Calling tool (e.g. "Google"), used to pick a per-tool summary model.
 
     Returns:
         str: A concise, focused summary generated by the LLM, or error message.
@@ -86,7 +369,7 @@ def summarize_article_with_focus(text: str, focus: str, max_chars: int = 4000) -
     prompt = FOCUSED_SUMMARY_PROMPT.format(text=text, focus=focus)
 
     try:
-        result = llm.invoke(prompt)
+        result = invoke_llm("summary", prompt, tool=tool)
         return result.content.strip()
 
     except Exception as e:
@@ -0,0 +1,146 @@
+# verdict_store.py
+
+import os
+import json
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from evidence import Evidence
+
+# === Store Location ===
+load_dotenv()
+VERDICT_STORE_PATH = os.getenv("VERDICT_STORE_PATH", os.path.join(".cache", "verdicts.sqlite3"))
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS verdicts (
+        claim_key      TEXT PRIMARY KEY,   -- normalised claim text
+        claim          TEXT NOT NULL,
+        mode           TEXT NOT NULL,
+        selected_tools TEXT NOT NULL,      -- JSON list
+        verdict        TEXT NOT NULL,
+        verified_at    REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sources (
+        claim_key     TEXT NOT NULL,
+        tool          TEXT NOT NULL,
+        position      INTEGER NOT NULL,
+        evidence      TEXT NOT NULL,       -- Evidence record as JSON (incl. its summary)
+        etag          TEXT NOT NULL DEFAULT '',
+        last_modified TEXT NOT NULL DEFAULT '',
+        content_hash  TEXT NOT NULL DEFAULT '',  -- sha256 of the extracted source text
+        PRIMARY KEY (claim_key, tool, position)
+    )
+    """,
+]
+
+
+# === Stored Records ===
+@dataclass(slots=True)
+class StoredSource:
+    """
+    One piece of evidence behind a stored verdict, with the validators used to
+    revalidate it (empty when the source was not fetched as a URL).
+    """
+    tool: str
+    evidence: Evidence
+    etag: str = ""
+    last_modified: str = ""
+    content_hash: str = ""
+
+
+@dataclass(slots=True)
+class StoredVerdict:
+    claim: str
+    mode: str
+    selected_tools: List[str]
+    verdict: str
+    verified_at: float
+    sources: List[StoredSource] = field(default_factory=list)
+
+    def tool_outputs(self) -> Dict[str, List[Evidence]]:
+        outputs: Dict[str, List[Evidence]] = {}
+        for source in self.sources:
+            outputs.setdefault(source.tool, []).append(source.evidence)
+        return outputs
+
+
+def claim_key(claim: str) -> str:
+    return " ".join(claim.lower().split())
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+# === Read / Write ===
+def save_verdict(record: StoredVerdict, path: str = VERDICT_STORE_PATH) -> None:
+    """
+    Saves (or replaces) a verdict together with all of its sources.
+    """
+    key = claim_key(record.claim)
+    with closing(_connect(path)) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?, ?)",
+            (key, record.claim, record.mode, json.dumps(record.selected_tools), record.verdict, record.verified_at),
+        )
+        conn.execute("DELETE FROM sources WHERE claim_key = ?", (key,))
+        positions: Dict[str, int] = {}
+        for source in record.sources:
+            position = positions.get(source.tool, 0)
+            positions[source.tool] = position + 1
+            conn.execute(
+                "INSERT INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, source.tool, position, json.dumps(source.evidence.to_dict()),
+                 source.etag, source.last_modified, source.content_hash),
+            )
+
+
+def load_verdict(claim: str, path: str = VERDICT_STORE_PATH) -> Optional[StoredVerdict]:
+    """
+    Loads the stored verdict for a claim, or None if it has never been verified.
+    """
+    key = claim_key(claim)
+    with closing(_connect(path)) as conn:
+        row = conn.execute(
+            "SELECT claim, mode, selected_tools, verdict, verified_at FROM verdicts WHERE claim_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        source_rows = conn.execute(
+            "SELECT tool, evidence, etag, last_modified, content_hash FROM sources "
+            "WHERE claim_key = ? ORDER BY tool, position",
+            (key,),
+        ).fetchall()
+
+    claim_text, mode, selected_tools, verdict, verified_at = row
+    return StoredVerdict(
+        claim=claim_text,
+        mode=mode,
+        selected_tools=json.loads(selected_tools),
+        verdict=verdict,
+        verified_at=verified_at,
+        sources=[
+            StoredSource(tool=tool, evidence=Evidence(**json.loads(evidence)),
+                         etag=etag, last_modified=last_modified, content_hash=content_hash)
+            for tool, evidence, etag, last_modified, content_hash in source_rows
+        ],
+    )
+
+
+def list_claims(path: str = VERDICT_STORE_PATH) -> List[str]:
+    """
+    Returns every claim with a stored verdict, oldest verification first.
+    """
+    with closing(_connect(path)) as conn:
+        return [claim for (claim,) in conn.execute("SELECT claim FROM verdicts ORDER BY verified_at")]
@@ -0,0 +1,205 @@
+# worker.py
+
+import os
+import time
+import socket
+import signal
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+from job_queue import JOB_VISIBILITY_TIMEOUT, QUEUED, RUNNING, Job, JobQueue, LeaseLost, get_job_queue
+
+load_dotenv()
+
+# === Worker Mode ===
+# Claims are enqueued as "verify" jobs; any number of worker processes (on this or other
+# machines sharing the queue backend) claim them, run the LangGraph pipeline and write
+# the result back to the queue. Each worker runs at most --concurrency jobs at a time
+# and keeps extending the leases of its running jobs so they are not handed out twice.
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+WORKER_POLL_SECONDS = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+
+
+# === Job Handlers ===
+def run_verify_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs one claim through the graph. Returns the verdict, the selected tools and the
+    evidence records (as dicts) so any process can rebuild the result.
+    """
+    from LangGraph import get_remedy_graph  # imported here so enqueue/status need no LLM setup
+
+    final_state = get_remedy_graph().invoke({"user_input": payload["claim"], "mode": payload.get("mode", "full")})
+    return {
+        "final_verdict": final_state.get("final_verdict", ""),
+        "selected_tools": final_state.get("selected_tools", []),
+        "tool_outputs": {
+            tool: [record.to_dict() for record in records]
+            for tool, records in (final_state.get("tool_outputs") or {}).items()
+        },
+    }
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "verify": run_verify_job,
+}
+
+
+# === Worker ===
+class Worker:
+    """
+    Pulls jobs from a queue and runs them on a bounded thread pool.
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = WORKER_CONCURRENCY, queue_name: str = "default",
+                 visibility_timeout: float = JOB_VISIBILITY_TIMEOUT, worker_id: Optional[str] = None):
+        self.queue = queue
+        self.concurrency = max(concurrency, 1)
+        self.queue_name = queue_name
+        self.visibility_timeout = visibility_timeout
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self._finished = threading.Event()  # set once in-flight jobs have drained
+        self._slots = threading.Semaphore(self.concurrency)
+        self._active: Dict[str, Job] = {}
+        self._active_lock = threading.Lock()
+        self.processed = 0
+
+    def _heartbeat(self) -> None:
+        # Extend every running job's lease well before it expires
+        while not self._finished.wait(self.visibility_timeout / 3):
+            with self._active_lock:
+                job_ids = list(self._active)
+            for job_id in job_ids:
+                try:
+                    self.queue.extend(job_id, self.worker_id, self.visibility_timeout)
+                except LeaseLost:
+                    print(f"⚠️ Lease lost for job {job_id}; its result will be discarded")
+                except Exception as e:
+                    print(f"⚠️ Could not extend lease for job {job_id}: {e}")
+
+    def _process(self, job: Job) -> None:
+        try:
+            handler = HANDLERS.get(job.kind)
+            if handler is None:
+                raise ValueError(f"no handler for job kind {job.kind!r}")
+            result = handler(job.payload)
+            self.queue.complete(job.id, self.worker_id, result)
+            print(f"✅ {job.kind} {job.id[:8]} done (attempt {job.attempts})")
+        except LeaseLost as e:
+            print(f"⚠️ {e}")
+        except Exception as e:
+            print(f"❌ {job.kind} {job.id[:8]} failed (attempt {job.attempts}/{job.max_attempts}): {e}")
+            try:
+                self.queue.fail(job.id, self.worker_id, f"{type(e).__name__}: {e}")
+            except LeaseLost:
+                pass
+        finally:
+            with self._active_lock:
+                self._active.pop(job.id, None)
+                self.processed += 1
+            self._slots.release()
+
+    def _drained(self) -> bool:
+        # No claimable job is not enough: failed jobs wait queued for their retry delay,
+        # and jobs running elsewhere may still fail or lose their lease
+        try:
+            counts = self.queue.counts(self.queue_name)
+        except Exception as e:
+            print(f"⚠️ Could not read queue counts: {e}")
+            return False
+        return counts.get(QUEUED, 0) == 0 and counts.get(RUNNING, 0) == 0
+
+    def run(self, exit_when_empty: bool = False, max_jobs: Optional[int] = None) -> int:
+        """
+        Claims and runs jobs until stopped (or, with exit_when_empty, until no job in the
+        queue is queued or running, including retries waiting for their delay).
+        Returns the number of jobs processed.
+        """
+        heartbeat = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+        heartbeat.start()
+        claimed = 0
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as pool:
+            while not self.stopping.is_set() and (max_jobs is None or claimed < max_jobs):
+                # Per-worker concurrency limit: only claim when a slot is free
+                if not self._slots.acquire(timeout=WORKER_POLL_SECONDS):
+                    continue
+
+                try:
+                    job = self.queue.claim(self.worker_id, self.queue_name, self.visibility_timeout)
+                except Exception as e:
+                    print(f"⚠️ Could not claim a job: {e}")
+                    job = None
+
+                if job is None:
+                    self._slots.release()
+                    with self._active_lock:
+                        idle = not self._active
+                    if exit_when_empty and idle and self._drained():
+                        break
+                    self.stopping.wait(WORKER_POLL_SECONDS)
+                    continue
+
+                with self._active_lock:
+                    self._active[job.id] = job
+                claimed += 1
+                pool.submit(self._process, job)
+
+        self.stopping.set()
+        self._finished.set()
+        return self.processed
+
+
+def wait_for_jobs(queue: JobQueue, job_ids: list, poll_seconds: float = WORKER_POLL_SECONDS,
+                  on_progress: Optional[Callable[[int, int], None]] = None) -> list:
+    """
+    Blocks until every job is done or failed and returns them in the given order.
+    """
+    while True:
+        jobs = queue.get(job_ids)
+        finished = sum(job.status in ("done", "failed") for job in jobs)
+        if on_progress:
+            on_progress(finished, len(job_ids))
+        if finished == len(job_ids):
+            return jobs
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Truth Chain worker mode: queue claims and process them.")
+    parser.add_argument("--queue-url", default=None, help="Queue backend URL (default: JOB_QUEUE_URL).")
+    parser.add_argument("--queue", default="default", help="Queue name.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Process jobs.")
+    run_parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Jobs run at once by this worker.")
+    run_parser.add_argument("--exit-when-empty", action="store_true", help="Stop once the queue is drained.")
+    run_parser.add_argument("--max-jobs", type=int, default=None, help="Stop after claiming this many jobs.")
+
+    enqueue_parser = commands.add_parser("enqueue", help="Queue claims from a file (one per line).")
+    enqueue_parser.add_argument("file")
+    enqueue_parser.add_argument("--mode", choices=["full", "fast"], default="full")
+
+    commands.add_parser("status", help="Show job counts per status.")
+    args = parser.parse_args()
+
+    queue = get_job_queue(args.queue_url) if args.queue_url else get_job_queue()
+
+    if args.command == "run":
+        worker = Worker(queue, concurrency=args.concurrency, queue_name=args.queue)
+        # Finish running jobs on Ctrl+C / SIGTERM instead of abandoning their leases
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: worker.stopping.set())
+        print(f"👷 Worker {worker.worker_id} started (concurrency {worker.concurrency})")
+        processed = worker.run(exit_when_empty=args.exit_when_empty, max_jobs=args.max_jobs)
+        print(f"👋 Worker stopped after {processed} jobs")
+    elif args.command == "enqueue":
+        with open(args.file, encoding="utf-8") as f:
+            claims = [line.strip() for line in f if line.strip()]
+        ids = queue.enqueue("verify", [{"claim": claim, "mode": args.mode} for claim in claims], queue=args.queue)
+        print(f"📥 Queued {len(ids)} claims")
+    else:
+        print(queue.counts(args.queue))